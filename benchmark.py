@@ -0,0 +1,363 @@
+# Scaling benchmarks for the schedulers in model.py
+# run: python benchmark.py [name ...], names are the keys of BENCHMARKS (all by default)
+import gc
+import sys
+import csv
+import queue
+import random
+import tracemalloc
+import multiprocessing
+import os.path
+import tempfile
+from math import log, log2
+from time import perf_counter
+from typing import List, Callable, Iterable, Tuple, Optional, Dict
+from model import Process, ScheduleMother, ScheduleSPN, ScheduleSRT, ScheduleHRRN, ScheduleRR, \
+    ScheduleFCFS, fcfs_batch, ProcessTable, read_table, convert_trace, load_binary_trace
+from workload import generate, EPOCH
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+SCALE_SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+POINT_SECONDS = 120  # a scheduler is not run on a bigger size if that one would take longer
+MIN_SECONDS = 0.02  # shorter runs are too noisy to tell the growth from
+GROWTH_LIMIT = 1.2  # slope of log(time) over log(n log n), n log n is 1, n^2 is about 2
+
+
+def random_processes(n: int, seed: int = 4001, max_gap: int = 4, max_calc: int = 20) -> List[Process]:
+    """
+        Returns n Processes With Random Arrival Gaps And Bursts (Same Seed, Same Workload).
+    """
+    rnd = random.Random(seed)
+    res = []
+    enter = 0
+    for i in range(n):
+        enter += rnd.randint(0, max_gap)
+        res.append(Process(f"P{i}", enter, rnd.randint(1, max_calc)))
+    return res
+
+
+def bursty_processes(n: int, seed: int = 4001, burst: int = 1000, max_calc: int = 20) -> List[Process]:
+    """
+        Returns n Processes Arriving In Dense Bursts Of About 'burst' Processes,
+        Every Arrival Of A Burst Lands While Earlier Ones Are Still Running.
+    """
+    rnd = random.Random(seed)
+    res = []
+    enter = 0
+    for i in range(n):
+        if i % burst == 0:
+            enter += burst * max_calc  # quiet period, the previous burst drains meanwhile
+        enter += rnd.randint(0, 1)
+        res.append(Process(f"P{i}", enter, rnd.randint(1, max_calc)))
+    return res
+
+
+def time_scheduler(factory: Callable[[], ScheduleMother], processes: Iterable[Process]) -> float:
+    """
+        Simulates The Processes With A New Scheduler, Returns Seconds Spent In The Simulation.
+    """
+    scheduler = factory()
+    for process in processes:
+        scheduler.add_process(process)
+    gc.disable()  # like timeit, the collector would otherwise rescan the growing gant chart
+    try:
+        start = perf_counter()
+        scheduler.get_gant()
+        return perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def scaling(title: str, factory: Callable[[], ScheduleMother], sizes=SIZES,
+            workload: Callable[..., List[Process]] = random_processes, **kwargs):
+    """
+        Prints Wall Time Per Size And Time / (n log n), The Last Column Should Stay Flat.
+    """
+    print(title)
+    print(f"{'n':>10} {'seconds':>10} {'ns/(n log n)':>14}")
+    for n in sizes:
+        seconds = time_scheduler(factory, workload(n, **kwargs))
+        print(f"{n:>10} {seconds:>10.3f} {seconds * 1e9 / (n * log2(n)):>14.2f}")
+
+
+def bench_spn():
+    scaling("SPN/SJF (heap ready queue)", ScheduleSPN)
+
+
+def bench_srt():
+    scaling("SRT (event driven, bursty arrivals)", ScheduleSRT, workload=bursty_processes)
+
+
+def legacy_hrrn(processes: List[Process]) -> List[Tuple[int, str]]:
+    """
+        The Previous ScheduleHRRN Simulation, Kept Only As A Timing Baseline:
+        Ratios Are Computed Once When A Process Is Inserted Into A Sorted List.
+    """
+    def priority_add_helper(queue: List[Process], element: Process, time: int = 0):
+        w1 = ((time - element.enter) + element.calc) / element.calc
+        for index, elem in enumerate(queue):
+            w2 = ((time - elem.enter) + elem.calc) / elem.calc
+            if w1 > w2:
+                queue.insert(index, element)
+                return
+        queue.append(element)
+
+    gant_chart = []
+    queue1 = sorted(processes, key=lambda e: e.enter)
+    priority_queue = []
+    time = queue1[0].enter
+    while queue1 or priority_queue:
+        while queue1 and queue1[0].enter <= time:
+            priority_add_helper(priority_queue, queue1.pop(0), time)
+        if not priority_queue:
+            time = queue1[0].enter
+            continue
+        elem = priority_queue.pop(0)
+        gant_chart.append((time, elem.name))
+        time += elem.calc
+    gant_chart.append((time, "END"))
+    return gant_chart
+
+
+def bench_hrrn(sizes=(100_000, 200_000)):
+    print("HRRN, ratio index vs previous sorted-list insertion")
+    print(f"{'n':>10} {'index s':>10} {'legacy s':>10} {'speedup':>8}")
+    for n in sizes:
+        processes = random_processes(n, max_gap=22)  # cpu ~95% busy, the ready queue stays short
+        seconds = time_scheduler(ScheduleHRRN, processes)
+        start = perf_counter()
+        legacy_hrrn(processes)
+        legacy = perf_counter() - start
+        print(f"{n:>10} {seconds:>10.3f} {legacy:>10.3f} {legacy / seconds:>7.1f}x")
+
+
+def bench_rr():
+    """
+        RR With Quantum 1 Makes One Queue Operation Per Time Unit, A Linear Queue Operation
+        Shows Up As ~100x Growth From 10^4 To 10^5 Processes Instead Of ~10x.
+    """
+    print("RR, quantum 1")
+    print(f"{'n':>10} {'seconds':>10}")
+    times = []
+    for n in (10_000, 100_000):
+        times.append(time_scheduler(lambda: ScheduleRR(quant=1, change_time=0), random_processes(n)))
+        print(f"{n:>10} {times[-1]:>10.3f}")
+    growth = times[1] / times[0]
+    print(f"growth x{growth:.1f}")
+    if growth > 30:
+        print("REGRESSION: RR queue operations are not constant time anymore")
+        sys.exit(1)
+
+
+def bench_fcfs_batch(sizes=SIZES):
+    """
+        Times fcfs_batch Against ScheduleFCFS And Checks Both Give The Same Gant Chart And Output.
+    """
+    print("FCFS, numpy batch vs process objects")
+    print(f"{'n':>10} {'batch s':>10} {'objects s':>10} {'speedup':>8}")
+    for n in sizes:
+        processes = random_processes(n, max_gap=25)  # with idle gaps
+        scheduler = ScheduleFCFS()
+        for process in processes:
+            scheduler.add_process(process)
+        start = perf_counter()
+        gant = scheduler.get_gant()
+        objects = perf_counter() - start
+        start = perf_counter()
+        order, starts, response, waiting = fcfs_batch([p.enter for p in processes], [p.calc for p in processes])
+        batch = perf_counter() - start
+        assert response.tolist() == [p.response for p in processes], "response mismatch"
+        assert waiting.tolist() == [p.waiting for p in processes], "waiting mismatch"
+        assert starts.tolist() == [t for t, _ in gant[:-1]], "gant mismatch"
+        assert [processes[i].name for i in order.tolist()] == [name for _, name in gant[:-1]], "gant mismatch"
+        print(f"{n:>10} {batch:>10.3f} {objects:>10.3f} {objects / batch:>7.1f}x")
+
+
+def bench_memory(n: int = 1_000_000):
+    """
+        Bytes Per Process Of A Workload Held As A List Of Process Objects And As A ProcessTable.
+    """
+    class DictProcess:  # what Process was before it had __slots__
+        def __init__(self, name: str, enter_time: int, calc_time: int):
+            self.name = name
+            self.enter = enter_time
+            self.calc = calc_time
+            self.state = None
+            self.response = None
+            self.waiting = None
+
+    def measure(build: Callable[[], object]) -> float:
+        tracemalloc.start()
+        kept = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del kept
+        return size / n
+
+    def rows():  # fresh name strings and int objects per process, like parsing a trace does
+        return ((f"P{i}", 10**6 + i * 2, i % 20 + 1) for i in range(n))
+
+    print(f"memory per process, {n} processes (names P0..P{n - 1})")
+    print(f"{'list of dict-based Process':>30} {measure(lambda: [DictProcess(*r) for r in rows()]):>8.1f} bytes")
+    print(f"{'list of slotted Process':>30} {measure(lambda: [Process(*r) for r in rows()]):>8.1f} bytes")
+    print(f"{'ProcessTable':>30} {measure(lambda: _table(rows())):>8.1f} bytes")
+
+
+def _table(rows: Iterable[Tuple[str, int, int]]) -> ProcessTable:
+    table = ProcessTable()
+    for row in rows:
+        table.append(*row)
+    return table
+
+
+def bench_binary(n: int = 1_000_000):
+    """
+        Text Trace Parsing vs Loading The Same Trace From The Binary Format.
+    """
+    print(f"trace loading, {n} processes")
+    with tempfile.TemporaryDirectory() as folder:
+        text = os.path.join(folder, "trace.txt")
+        binary = os.path.join(folder, "trace.bin")
+        with open(text, "w") as file:
+            for process in random_processes(n):
+                file.write(f"{process.name} {process.enter} {process.calc}\n")
+        start = perf_counter()
+        read_table(text)
+        print(f"{'parse text':>20} {perf_counter() - start:>10.3f} s")
+        start = perf_counter()
+        convert_trace(text, binary)
+        print(f"{'convert (once)':>20} {perf_counter() - start:>10.3f} s")
+        start = perf_counter()
+        table = load_binary_trace(binary)
+        print(f"{'load binary':>20} {perf_counter() - start:>10.3f} s")
+        start = perf_counter()
+        fcfs_batch(table.enter, table.calc)  # numpy reads the mapped columns in place
+        print(f"{'fcfs_batch on it':>20} {perf_counter() - start:>10.3f} s")
+        del table
+
+
+def _reset_peak_rss() -> bool:
+    # linux only, a new process inherits the peak of its parent (ru_maxrss even survives exec), this clears it
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss() -> Optional[int]:
+    # peak resident memory since the last _reset_peak_rss, in bytes
+    with open("/proc/self/status") as file:
+        for line in file:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024  # in KiB
+    return None
+
+
+def _scaling_point(scheduler: type, kind: str, n: int, options: Dict, results: multiprocessing.Queue):
+    # runs in a new process, the peak is of the simulation, with the workload and the interpreter resident
+    scheduler = scheduler()
+    scheduler.add_table(generate(kind, n, **options))
+    gc.collect()
+    gc.disable()
+    measured = _reset_peak_rss()
+    start = perf_counter()
+    scheduler.get_chart()
+    seconds = perf_counter() - start
+    results.put((seconds, _peak_rss() if measured else None))
+
+
+def measure_point(scheduler: type, kind: str, n: int, **options) -> Optional[Tuple[float, Optional[int]]]:
+    """
+        Generates A Workload (See workload.rows For Options) And Simulates It In A New Process.
+        :return: (seconds of the simulation, peak resident memory during it in bytes, None where there is
+                 no /proc/self/clear_refs to reset the peak, like on macos and windows),
+                 None if it took more than 4 * POINT_SECONDS, the process is killed then
+    """
+    context = multiprocessing.get_context("spawn")  # a fresh interpreter, nothing of ours is resident in it
+    results = context.Queue()
+    process = context.Process(target=_scaling_point, args=(scheduler, kind, n, options, results))
+    process.start()
+    try:
+        return results.get(timeout=4 * POINT_SECONDS)
+    except queue.Empty:
+        return None
+    finally:
+        process.terminate()
+        process.join()
+
+
+def growth(points: List[Tuple[int, float]]) -> Optional[float]:
+    """
+        Least Squares Slope Of log(seconds) Over log(n log n), Of The Points That Took At Least MIN_SECONDS.
+        About 1 For n log n Or Better, Above GROWTH_LIMIT For Anything Worse, None With Less Than Two Points.
+    """
+    points = [(log(n * log2(n)), log(seconds)) for n, seconds in points if seconds >= MIN_SECONDS]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread if spread else None
+
+
+def bench_scaling(kind: str = "poisson", sizes=SCALE_SIZES, label: Optional[str] = None, **options):
+    """
+        Every Scheduler Over Every Size Of A Generated Workload, Wall Time And Peak Memory.
+        The ns/(n log n) Column Is The Scaling Curve, It Should Stay Flat, Schedulers Growing Faster
+        Are Flagged. Sizes Past POINT_SECONDS Are Skipped. The Points Are Also Written To scaling-<label>.csv,
+        The Label Is The Workload Kind By Default.
+    """
+    label = label or kind
+    print(f"scaling, {label} workload")
+    print(f"{'scheduler':>10} {'n':>10} {'seconds':>10} {'peak MiB':>9} {'ns/(n log n)':>14}")
+    rows = []
+    flagged = []
+    for scheduler in ScheduleMother.__subclasses__():
+        points = []
+        for index, n in enumerate(sizes):
+            if points and points[-1][1] * (n * log2(n)) / (points[-1][0] * log2(points[-1][0])) > POINT_SECONDS:
+                print(f"{scheduler.name:>10} {n:>10} {'skipped, too slow':>35}")
+                break
+            res = measure_point(scheduler, kind, n, **options)
+            if res is None:
+                print(f"{scheduler.name:>10} {n:>10} {'timed out':>35}")
+                flagged.append(scheduler.name)
+                break
+            seconds, peak = res
+            points.append((n, seconds))
+            rows.append({"scheduler": scheduler.name, "workload": label, "n": n, "seconds": seconds,
+                         "peak_bytes": peak})
+            peak = f"{peak / 2 ** 20:>9.1f}" if peak is not None else f"{'-':>9}"
+            print(f"{scheduler.name:>10} {n:>10} {seconds:>10.3f} {peak} {seconds * 1e9 / (n * log2(n)):>14.2f}")
+        slope = growth(points)
+        if slope is not None and slope > GROWTH_LIMIT:
+            print(f"{scheduler.name:>10} grows worse than n log n: time ~ (n log n)^{slope:.2f}")
+            flagged.append(scheduler.name)
+    with open(f"scaling-{label}.csv", "w", newline="") as file:
+        writer = csv.DictWriter(file, ["scheduler", "workload", "n", "seconds", "peak_bytes"])
+        writer.writeheader()
+        writer.writerows(rows)
+    if flagged:
+        print("WORSE THAN n log n:", ", ".join(flagged))
+        sys.exit(1)
+
+
+BENCHMARKS = {
+    "spn": bench_spn,
+    "srt": bench_srt,
+    "hrrn": bench_hrrn,
+    "rr": bench_rr,
+    "fcfs_batch": bench_fcfs_batch,
+    "memory": bench_memory,
+    "binary": bench_binary,
+    "scaling": bench_scaling,
+    "scaling_heavy": lambda: bench_scaling("heavy"),
+    "scaling_bimodal": lambda: bench_scaling("bimodal"),
+    "scaling_epoch": lambda: bench_scaling("poisson", label="epoch", start=EPOCH),
+}
+
+if __name__ == '__main__':
+    for bench in (sys.argv[1:] or BENCHMARKS):
+        BENCHMARKS[bench]()
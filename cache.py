@@ -0,0 +1,97 @@
+# cache.py - simulation results saved in the Database, keyed on workload contents and scheduler
+import pickle
+import hashlib
+import threading
+from typing import Dict, List, Tuple, Union, Optional, Callable, Sequence
+from database import Database
+from model import ScheduleMother, Process, ProcessTable, read_table
+
+CACHE_VERSION = 3  # change it when the simulation gives other results, old entries are never hit again
+INDEX_KEY = "result cache"  # Database key of the cache index: {entry key: size in bytes}, least recent first
+MAX_BYTES = 256 * 2 ** 20
+
+Output = Union[List[Process], ProcessTable]
+
+
+def workload_digest(filename: str, chunk_size: int = 1 << 20, cancel: Optional[threading.Event] = None,
+                    progress: Optional[Callable[[int], None]] = None) -> Optional[str]:
+    """
+        Hash Of The File Contents, So The Same Workload Is Found Under Any Name Or Path,
+        And A Changed File Is Not. Same 'cancel' And 'progress' As TraceReader, None If Cancelled.
+    """
+    digest = hashlib.sha256()
+    with open(filename, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            if cancel is not None and cancel.is_set():
+                return None
+            if progress is not None:
+                progress(len(chunk))
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+        Outputs And Gant Charts Of Simulations, Kept In A Database Up To 'max_bytes' (Pickled Size).
+        Entries Are Evicted Least Recently Used First, Recency Is Saved With Them.
+    """
+
+    def __init__(self, database: Optional[Database] = None, max_bytes: int = MAX_BYTES):
+        self.database = database if database is not None else Database()
+        self.max_bytes = max_bytes
+        self._index: Dict[str, int] = self.database[INDEX_KEY] if INDEX_KEY in self.database else {}
+
+    @staticmethod
+    def key(digest: str, scheduler: ScheduleMother) -> str:
+        parameters = ",".join(f"{name}={value}" for name, value in sorted(scheduler.parameters().items()))
+        return f"result:{CACHE_VERSION}:{digest}:{scheduler.name}({parameters})"
+
+    def size(self) -> int:
+        return sum(self._index.values())
+
+    def get(self, key: str) -> Optional[Tuple[Output, Sequence[Tuple[int, str]]]]:
+        """
+            Returns (output, gant chart) Saved Under The Key, Or None.
+        """
+        if key not in self._index:
+            return None
+        self._index[key] = self._index.pop(key)  # now the most recent
+        self._save_index()
+        return pickle.loads(self.database[key])
+
+    def put(self, key: str, output: Output, gant: Sequence[Tuple[int, str]]):
+        """
+            Saves A Result, Evicting The Least Recently Used Ones To Stay Under 'max_bytes'.
+            A Result Bigger Than 'max_bytes' Is Not Saved.
+        """
+        blob = pickle.dumps((output, gant), pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        if key in self._index:
+            del self._index[key]
+        total = self.size()
+        for old in list(self._index):
+            if total + len(blob) <= self.max_bytes:
+                break
+            total -= self._index.pop(old)
+            del self.database[old]
+        self.database[key] = blob
+        self._index[key] = len(blob)
+        self._save_index()
+
+    def run(self, scheduler: ScheduleMother, filename: str,
+            load: Callable[[str], ProcessTable] = read_table) -> Tuple[Output, Sequence[Tuple[int, str]]]:
+        """
+            Results Of The Scheduler On A Trace File, From The Cache If It Was Simulated Before,
+            Otherwise The File Is Loaded With 'load', Simulated And The Result Is Saved.
+        """
+        key = self.key(workload_digest(filename), scheduler)
+        res = self.get(key)
+        if res is None:
+            scheduler.add_table(load(filename))
+            res = scheduler.get_output(), scheduler.get_gant()
+            self.put(key, *res)
+        return res
+
+    def _save_index(self):
+        self.database[INDEX_KEY] = self._index
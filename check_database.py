@@ -0,0 +1,209 @@
+# Checks of the Database files: concurrent writers, crashes, merges, compactions and headers of the baseline
+# run: python check_database.py [writers], in a temporary directory that is removed after
+import os
+import sys
+import subprocess
+import tempfile
+import multiprocessing
+from types import ModuleType
+from typing import Any, Dict, List
+import database
+from database import Database
+from check_schedulers import BASELINE, ROOT
+
+KEYS = 300  # keys each writer sets
+SHARED = "shared"  # key every writer sets
+
+
+def baseline_database(revision: str = BASELINE) -> ModuleType:
+    """
+        Imports database.py As It Was At 'revision', Read With git show, Under The Name 'database',
+        So The Headers It Pickles Refer To database.Database.Node Like The Ones It Wrote Did.
+    """
+    shown = subprocess.run(["git", "-C", ROOT, "show", f"{revision}:database.py"], capture_output=True, text=True)
+    if shown.returncode:
+        raise SystemExit(f"Baseline {revision} is not in this repository's history")
+    module = ModuleType("database")
+    exec(compile(shown.stdout, f"{revision}:database.py", "exec"), module.__dict__)
+    return module
+
+
+def reopen(filename: str, **options) -> Database:
+    if os.path.abspath(filename) in Database._dict:
+        Database._dict[os.path.abspath(filename)].close()
+    return Database(filename, **options)
+
+
+def differences(db: Database, expected: Dict[Any, Any]) -> List[str]:
+    """
+        How The Keys And Values Of 'db' Differ From 'expected', Empty When They Are The Same.
+    """
+    res = []
+    if len(db) != len(expected):
+        res.append(f"{len(db)} keys, expected {len(expected)}")
+    keys = set(db.keys())
+    if keys != set(expected):
+        res.append(f"missing {sorted(set(expected) - keys)[:5]}, extra {sorted(keys - set(expected))[:5]}")
+    for key, value in expected.items():
+        if key not in db:
+            res.append(f"{key!r} is not in it")
+        elif db[key] != value:
+            res.append(f"{key!r} is {db[key]!r}, expected {value!r}")
+    return res
+
+
+def writer(filename: str, number: int):
+    """
+        Sets KEYS Keys And SHARED Through Small Batches, One Writer Compacts And One Merges Half Way.
+    """
+    db = Database(filename, batch_bytes=4096, cache_bytes=16384, sync=False)
+    for index in range(KEYS):
+        db[f"w{number}:{index}"] = (number, index, "x" * 50)
+        db[SHARED] = (number, index)
+        if index == KEYS // 2 and number < 2:
+            db.compact() if number == 0 else db.merge()
+        if index % 50 == 49:
+            db.flush()
+    db.close()
+
+
+def check_writers(directory: str, writers: int) -> List[str]:
+    filename = os.path.join(directory, "writers")
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=writer, args=(filename, number)) for number in range(writers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    res = [f"writer {number} exited with {process.exitcode}" for number, process in enumerate(processes)
+           if process.exitcode]
+    db = reopen(filename)
+    shared = db[SHARED] if SHARED in db else None
+    expected = {f"w{number}:{index}": (number, index, "x" * 50) for number in range(writers) for index in range(KEYS)}
+    expected[SHARED] = shared
+    if shared is None or shared[1] != KEYS - 1:
+        res.append(f"{SHARED!r} is {shared!r}, not the last value of a writer")
+    return res + differences(db, expected)
+
+
+def check_torn_header(directory: str) -> List[str]:
+    """
+        A Crash In The Middle Of Writing The Last Record: Only It Is Lost, And The Next Commit Writes Over It.
+    """
+    filename = os.path.join(directory, "torn")
+    db = reopen(filename, sync=False)
+    db.set_many({index: index for index in range(10)})
+    db.commit()
+    db["last"] = "lost"
+    db.close()
+    with open(filename + ".header", "r+b") as file:
+        file.truncate(os.path.getsize(filename + ".header") - 3)
+    expected = {index: index for index in range(10)}
+    db = reopen(filename, sync=False)
+    res = [f"after the crash: {difference}" for difference in differences(db, expected)]
+    db["after"] = "kept"
+    db.commit()
+    expected["after"] = "kept"
+    db = reopen(filename)
+    return res + [f"after the next commit: {difference}" for difference in differences(db, expected)]
+
+
+def check_merge_compact(directory: str) -> List[str]:
+    filename = os.path.join(directory, "rewrite")
+    res = []
+    expected = {}
+    db = reopen(filename, sync=False)
+    for step, rewrite in enumerate((Database.merge, Database.compact, Database.merge, Database.compact)):
+        for index in range(200):
+            db[(step, index)] = expected[(step, index)] = [step, index] * (index % 7)
+        for index in range(0, 200, 3):
+            del db[(step, index)]
+            del expected[(step, index)]
+        if step:
+            db[(step - 1, 1)] = expected[(step - 1, 1)] = "changed"
+        rewrite(db)
+        db = reopen(filename, sync=False)
+        res += [f"after {rewrite.__name__} {step}: {difference}" for difference in differences(db, expected)]
+    return res
+
+
+def check_delete_set(directory: str) -> List[str]:
+    """
+        A Key Deleted Then Set Again, And One Set Then Deleted, Before A Commit,
+        With Another Process Compacting In Between So The Files Are Opened Again.
+    """
+    filename = os.path.join(directory, "delete_set")
+    db = reopen(filename, sync=False)
+    db["again"] = "old"
+    db.commit()
+    del db["again"]
+    db["again"] = "new"
+    db["gone"] = "never saved"
+    del db["gone"]
+    expected = {"again": "new"}
+    res = [f"before the commit: {difference}" for difference in differences(db, expected)]
+    context = multiprocessing.get_context("spawn")
+    other = context.Process(target=writer, args=(filename, 0))
+    other.start()
+    other.join()
+    db.refresh()
+    expected.update({f"w0:{index}": (0, index, "x" * 50) for index in range(KEYS)})
+    expected[SHARED] = (0, KEYS - 1)
+    res += [f"after the compaction: {difference}" for difference in differences(db, expected)]
+    db.commit()
+    db = reopen(filename)
+    return res + [f"after reopening: {difference}" for difference in differences(db, expected)]
+
+
+def check_baseline_header(directory: str) -> List[str]:
+    """
+        Files Written By The Baseline, With Its Pickled {key: Node} Header, Are Read And Converted.
+    """
+    filename = os.path.join(directory, "baseline")
+    baseline = baseline_database()
+    sys.modules["database"] = baseline  # its nodes are pickled as database.Database.Node
+    try:
+        db = baseline.Database(filename)
+        expected = {f"k{index}": {"index": index} for index in range(50)}
+        for key, value in expected.items():
+            db[key] = value
+        db.flush()
+        db["k3"] = expected["k3"] = "replaced"
+        db.flush()  # the baseline rewrites .bin when a value changes
+    finally:
+        sys.modules["database"] = database
+    res = [f"converted: {difference}" for difference in differences(reopen(filename, sync=False), expected)]
+    db = Database(filename)
+    db["k4"] = expected["k4"] = "after"
+    del db["k5"]
+    del expected["k5"]
+    db = reopen(filename)
+    return res + [f"after a commit: {difference}" for difference in differences(db, expected)]
+
+
+def check(writers: int = 4) -> int:
+    """
+        Runs Every Check In A Temporary Directory, Prints What Failed, Returns The Number Of Failed Checks.
+    """
+    bad = 0
+    with tempfile.TemporaryDirectory() as directory:
+        for name, run in (("concurrent writers", lambda: check_writers(directory, writers)),
+                          ("torn header record", lambda: check_torn_header(directory)),
+                          ("merge and compact", lambda: check_merge_compact(directory)),
+                          ("delete and set", lambda: check_delete_set(directory)),
+                          ("baseline header", lambda: check_baseline_header(directory))):
+            try:
+                failures = run()
+            except Exception as error:
+                failures = [f"{type(error).__name__}: {error}"]
+            print(f"{name}: {'FAILED' if failures else 'ok'}")
+            for failure in failures[:5]:
+                print(f"  {failure}")
+            bad += bool(failures)
+        for db in list(Database._dict.values()):
+            db.close()
+    return bad
+
+
+if __name__ == '__main__':
+    sys.exit(1 if check(*map(int, sys.argv[1:2])) else 0)
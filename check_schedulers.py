@@ -0,0 +1,185 @@
+# Differential check of the schedulers in model.py against model.py before the simulation kernel rewrite
+# run: python check_schedulers.py [workloads] [revision], revision is BASELINE by default
+import sys
+import random
+import subprocess
+import os.path
+from fractions import Fraction
+from types import ModuleType
+from typing import List, Tuple, Optional
+import model
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BASELINE = "b80a1b33b962d6b7842f3ff7acdf23096f4ff6b3"  # the last commit with one hand-written loop per scheduler
+# the baseline FCFS ran processes before their enter time across idle gaps and RR queued every process at once,
+# against it they only get workloads where every process enters at the same time
+SAME_ENTER = {"ScheduleFCFS", "ScheduleRR"}
+# the baseline HRRN ranked processes by their ratio when they entered, not at dispatch, it's not compared to it
+NOT_BASELINE = {"ScheduleHRRN"}
+
+Result = Tuple[List[Tuple[int, str]], List[Tuple[str, Optional[int], Optional[int]]]]
+
+
+def baseline_model(revision: str = BASELINE) -> ModuleType:
+    """
+        Imports model.py As It Was At 'revision', Read With git show.
+    """
+    shown = subprocess.run(["git", "-C", ROOT, "show", f"{revision}:model.py"], capture_output=True, text=True)
+    if shown.returncode:
+        raise SystemExit(f"Baseline {revision} is not in this repository's history, give one as the second argument")
+    source = shown.stdout
+    module = ModuleType("baseline_model")
+    exec(compile(source, f"{revision}:model.py", "exec"), module.__dict__)
+    return module
+
+
+def workload(rnd: random.Random, same_enter: bool = False) -> List[Tuple[str, int, int]]:
+    res = []
+    enter = 0
+    for index in range(rnd.randint(1, 40)):
+        if not same_enter:
+            enter += rnd.choice((0, 0, 1, 2, 3, 8))
+        res.append((f"P{index}", enter, rnd.choice((1, 2, 3, 4, 6, 10))))  # equal bursts test the tie rules
+    return res
+
+
+def normalize(gant: List[Tuple[int, str]]) -> List[Tuple[int, str]]:
+    """
+        Gant Chart Without Differences That Are Only In How Runs Are Written: The Current Chart Merges
+        Back-To-Back Runs Of One Process, The Baseline Wrote Them As Separate Entries (With A Marker Between).
+    """
+    res = []
+    last = None  # last process that ran
+    index = 0
+    while index < len(gant):
+        time, name = gant[index]
+        if name == "QUANT" and index + 1 < len(gant) and gant[index + 1] == (time, last):
+            index += 2
+            continue
+        if name not in ("QUANT", "END") and res and res[-1][1] == name:
+            index += 1
+            continue
+        res.append((time, name))
+        if name not in ("QUANT", "END"):
+            last = name
+        index += 1
+    return res
+
+
+def run(module: ModuleType, scheduler: str, rows: List[Tuple[str, int, int]], **options) -> Result:
+    instance = getattr(module, scheduler)(**options)
+    processes = [module.Process(*row) for row in rows]
+    for process in processes:
+        instance.add_process(process)
+    gant = normalize(list(instance.get_gant()))
+    return gant, [(process.name, process.response, process.waiting) for process in processes]
+
+
+def reference_rr(rows: List[Tuple[str, int, int]], quant: int, change_time: int) -> Result:
+    """
+        Round Robin Written Plainly: Processes That Enter During A Run, Or As It Ends,
+        Are Queued Before The Process That Ran, Then The Context Switch Time Passes.
+    """
+    pending = sorted(rows, key=lambda row: row[1])
+    queue: List[List] = []  # [name, enter, calc, time left]
+    gant = []
+    results = {}
+    time = pending[0][1]
+    index = 0
+    while index < len(pending) or queue:
+        while index < len(pending) and pending[index][1] <= time:
+            queue.append([*pending[index], pending[index][2]])
+            index += 1
+        if not queue:
+            time = pending[index][1]
+            continue
+        job = queue.pop(0)
+        gant.append((time, job[0]))
+        time += min(job[3], quant)
+        job[3] -= min(job[3], quant)
+        while index < len(pending) and pending[index][1] <= time:
+            queue.append([*pending[index], pending[index][2]])
+            index += 1
+        if job[3]:
+            queue.append(job)
+        else:
+            results[job[0]] = (time - job[1], time - job[1] - job[2])
+        gant.append((time, "QUANT"))
+        time += change_time
+    gant[-1] = (time - change_time, "END")
+    return normalize(gant), [(name, *results[name]) for name, _, _ in rows]
+
+
+def reference_hrrn(rows: List[Tuple[str, int, int]]) -> Result:
+    """
+        Highest Response Ratio Next Written Plainly: At Each Dispatch Every Ready Process's Ratio Is Computed,
+        Equal Ratios Go To The Earliest Entered, Then The First Listed.
+    """
+    pending = sorted(range(len(rows)), key=lambda index: rows[index][1])
+    ready: List[int] = []
+    gant = []
+    results = {}
+    time = rows[pending[0]][1]
+    while pending or ready:
+        while pending and rows[pending[0]][1] <= time:
+            ready.append(pending.pop(0))
+        if not ready:
+            time = rows[pending[0]][1]
+            continue
+        best = max(ready, key=lambda index: (Fraction(time - rows[index][1] + rows[index][2], rows[index][2]),
+                                             -rows[index][1], -index))
+        ready.remove(best)
+        name, enter, calc = rows[best]
+        gant.append((time, name))
+        time += calc
+        results[name] = (time - enter, time - enter - calc)
+    gant.append((time, "END"))
+    return normalize(gant), [(name, *results[name]) for name, _, _ in rows]
+
+
+def check(count: int = 500, revision: str = BASELINE) -> int:
+    """
+        Runs Every Scheduler Of The Baseline And The Current Model On 'count' Random Workloads,
+        Round Robin Against reference_rr On Workloads With Arrivals During Runs And HRRN Against reference_hrrn.
+        Workloads The Baseline Fails On (Like SPN With The Cpu Idle) Are Skipped. Returns The Number Of Mismatches.
+    """
+    baseline = baseline_model(revision)
+    schedulers = [cls.__name__ for cls in model.ScheduleMother.__subclasses__()
+                  if hasattr(baseline, cls.__name__) and cls.__name__ not in NOT_BASELINE]
+    bad = tried = 0
+
+    def compare(title: str, expected: Result, got: Result):
+        nonlocal bad, tried
+        tried += 1
+        if expected != got:
+            bad += 1
+            if bad <= 3:
+                print(f"MISMATCH {title}\n  expected {expected}\n  got      {got}")
+
+    rnd = random.Random(4001)
+    for _ in range(count):
+        for scheduler in schedulers:
+            rows = workload(rnd, scheduler in SAME_ENTER)
+            options = {"quant": rnd.choice((1, 3, 10)), "change_time": rnd.choice((0, 2))} \
+                if scheduler == "ScheduleRR" else {}
+            try:
+                expected = run(baseline, scheduler, rows, **options)
+            except Exception:  # the baseline fails on it, nothing to compare to
+                continue
+            compare(f"{scheduler} {options} {rows}", expected, run(model, scheduler, rows, **options))
+        rows = workload(rnd)
+        quant, change_time = rnd.choice((1, 3, 10)), rnd.choice((0, 1, 2))
+        compare(f"ScheduleRR(quant={quant}, change_time={change_time}) {rows}",
+                reference_rr(rows, quant, change_time), run(model, "ScheduleRR", rows, quant=quant,
+                                                             change_time=change_time))
+        rows = workload(rnd)
+        compare(f"ScheduleHRRN {rows}", reference_hrrn(rows), run(model, "ScheduleHRRN", rows))
+    rows = [("P0", 0, 5), ("P1", 1, 5), ("P2", 2, 5)]  # P1 and P2 enter during P0's first run
+    compare("ScheduleRR mid-run arrivals", reference_rr(rows, 3, 1),
+            run(model, "ScheduleRR", rows, quant=3, change_time=1))
+    print(f"compared {tried}, mismatches {bad}")
+    return bad
+
+
+if __name__ == '__main__':
+    sys.exit(1 if check(int(sys.argv[1]) if len(sys.argv) > 1 else 500, *sys.argv[2:3]) else 0)
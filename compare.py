@@ -0,0 +1,115 @@
+# compare.py - run every scheduler over one workload, in parallel, and summarize them
+import os.path
+import tempfile
+import multiprocessing
+from math import ceil
+from operator import ne
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Sequence, Union, Iterator
+from model import ScheduleMother, ProcessTable, read_table, is_binary_trace, save_binary_trace, \
+    load_binary_trace
+
+COLUMNS = [  # (key, title) of the comparison table
+    ("scheduler", "Scheduler"),
+    ("wait_mean", "Wait mean"), ("wait_p95", "Wait p95"), ("wait_p99", "Wait p99"),
+    ("response_mean", "Resp mean"), ("response_p95", "Resp p95"), ("response_p99", "Resp p99"),
+    ("throughput", "Throughput"), ("switches", "Switches"),
+]
+
+
+def percentile(ordered: Sequence[int], percent: float) -> int:
+    """
+        Nearest-Rank Percentile Of An Already Sorted Sequence.
+    """
+    if not ordered:
+        return 0
+    rank = max(1, ceil(len(ordered) * percent / 100))
+    return ordered[rank - 1]
+
+
+def summarize(scheduler: ScheduleMother) -> Dict[str, Union[str, int, float]]:
+    """
+        Simulates (If Not Done Yet) And Returns The Metrics Of One Scheduler:
+        Mean, p95 And p99 Of Waiting And Response Time, Throughput (Processes Per Time Unit
+        From The First Arrival To The End) And Context Switches (Times The CPU Moved To Another Process).
+    """
+    chart = scheduler.get_chart()
+    table = scheduler.table
+    res: Dict[str, Union[str, int, float]] = {"scheduler": scheduler.name}
+    for key, column in (("wait", table.waiting), ("response", table.response)):
+        ordered = sorted(column)
+        res[key + "_mean"] = sum(ordered) / len(ordered) if ordered else 0
+        res[key + "_p95"] = percentile(ordered, 95)
+        res[key + "_p99"] = percentile(ordered, 99)
+    span = chart.end - chart.starts[0] if len(chart) else 0
+    res["throughput"] = len(table) / span if span else 0
+    ids = chart.ids
+    # runs of one process are already merged, rows are processes even when their names are the same
+    res["switches"] = sum(map(ne, ids, islice(ids, 1, None)))
+    return res
+
+
+def _run_one(trace: str, scheduler_name: str) -> Dict[str, Union[str, int, float]]:
+    # runs in a worker process, the trace is memory-mapped, so all workers share the same pages
+    scheduler = _schedulers()[scheduler_name]()
+    scheduler.add_table(load_binary_trace(trace))
+    return summarize(scheduler)
+
+
+def pool_context():
+    """
+        Start Method For Worker Pools, controller.py Has No Main Guard,
+        So Spawned Workers Would Import It Again And Start The UI, Fork Is Used Where It Exists.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+@contextmanager
+def shared_trace(workload: Union[str, ProcessTable]) -> Iterator[str]:
+    """
+        Gives A Binary Trace File Of The Workload, For Workers To Memory-Map Instead Of Receiving A Copy.
+        A Binary Trace Is Used As It Is, Anything Else Is Written To A Temporary One, Removed Afterwards.
+    """
+    if isinstance(workload, str) and is_binary_trace(workload):
+        yield workload
+        return
+    with tempfile.TemporaryDirectory() as folder:
+        trace = os.path.join(folder, "workload.bin")
+        save_binary_trace(read_table(workload) if isinstance(workload, str) else workload, trace)
+        yield trace
+
+
+def _schedulers() -> Dict[str, type]:
+    return {cls.name: cls for cls in ScheduleMother.__subclasses__()}
+
+
+def compare_schedulers(workload: Union[str, ProcessTable], schedulers: Optional[List[str]] = None,
+                       workers: Optional[int] = None) -> List[Dict[str, Union[str, int, float]]]:
+    """
+        Runs Every Registered Scheduler (Or The Named Ones) On The Same Workload, One Per Worker Process.
+        The Workload Is Loaded Once, Workers Memory-Map It As A Binary Trace Instead Of Receiving A Copy.
+        :param workload: a trace file (text or binary) or a ProcessTable
+        :param schedulers: names of schedulers to run, all of them by default
+        :param workers: number of worker processes, number of cpus by default
+        :return: one summarize() dict per scheduler, in the order of 'schedulers'
+    """
+    if schedulers is None:
+        schedulers = list(_schedulers())
+    with shared_trace(workload) as trace, ProcessPoolExecutor(workers, mp_context=pool_context()) as pool:
+        futures = [pool.submit(_run_one, trace, name) for name in schedulers]
+        return [future.result() for future in futures]
+
+
+def format_table(rows: List[Dict[str, Union[str, int, float]]]) -> str:
+    lines = [" ".join(f"{title:>11}" for _, title in COLUMNS)]
+    for row in rows:
+        cells = []
+        for key, _ in COLUMNS:
+            value = row[key]
+            cells.append(f"{value:>11.2f}" if isinstance(value, float) else f"{value:>11}")
+        lines.append(" ".join(cells))
+    return "\n".join(lines)
@@ -1,9 +1,14 @@
 from database import Database
 import view_text as ui
-from model import read_from_file, ScheduleMother, write_to_file
+from model import ScheduleMother, write_to_file, TraceReader, read_table, is_binary_trace
 from view import Panel
+from compare import compare_schedulers, format_table
+from sweep import sweep_rr, format_front
+from cache import ResultCache
+from worker import SimulationRun
 
 data = Database()
+results = ResultCache(data)
 if "UI" not in data:
     ui.say_seperator()
     data["UI"] = ui.ask_options("Choose UI type", [("text mode", "TEXT")])
@@ -12,27 +17,36 @@ if data["UI"] == "TEXT":
     filename = ui.ask_string("Filename (empty for SampleTest.txt): ")
     if not filename:
         filename = 'SampleTest.txt'
-    processes = read_from_file(filename)
+
+    def load(file_name: str):
+        if is_binary_trace(file_name):  # no lines to reject, it's mapped as it is
+            return read_table(file_name)
+        reader = TraceReader(file_name)
+        table = reader.table()
+        if reader.rejected:
+            ui.say_warning(reader.report())
+        return table
     scheduler = ui.ask_options("Choose Your Scheduler:", [(i.name, i) for i in ScheduleMother.__subclasses__()])()
-    for process in processes:
-        scheduler.add_process(process)
-    write_to_file("Output.txt", scheduler.get_output(), "name", "response", "waiting")
+    output, gant = results.run(scheduler, filename, load)
+    write_to_file("Output.txt", output, "name", "response", "waiting")
     # main menu
     while True:
         ui.say_seperator()
         op = ui.ask_options("What to do:", [('exit', None),
                                             ('show gant chart', 1),
                                             ('show output file', 2),
-                                            ('switch to gui', 3)
+                                            ('switch to gui', 3),
+                                            ('compare all schedulers', 4),
+                                            ('sweep RR quantum and switch time', 5)
                                             ],)
         if op is None:
             break
         elif op == 1:
-            z = ui.ask_integer("Gant Zoom Scale? (1 to 50 or 'enter' for 2)")
-            if not z:
-                z = 2
-            assert 0 < z < 51, "What did you think?"
-            ui.draw_gant(scheduler.get_gant(), zoom=z)
+            z = ui.ask_integer("Gant Zoom Scale? (time units per line, or 'enter' to fit the screen)")
+            while z is not None and z < 1:
+                z = ui.ask_integer("Zoom Scale Is 1 Or More, Or 'enter' to fit the screen")
+            compact = ui.ask_options("Layout:", [("vertical", False), ("compact", True)])
+            ui.draw_gant(gant, zoom=z, compact=bool(compact))
         elif op == 2:
             ui.say("\t\t\tOutput.txt")
             ui.say("name\t\tresponse\twaiting")
@@ -42,15 +56,16 @@ if data["UI"] == "TEXT":
         elif op == 3:
             data["UI"] = "GUI"
             break
+        elif op == 4:
+            ui.say(format_table(compare_schedulers(filename)))
+        elif op == 5:
+            ui.say(format_front(sweep_rr(filename, rounds=2)[0]))
         # the exit 'elif' will break the while then saves and exits...
 if data['UI'] == "GUI":  # it's an if, because if the text-mode exits by setting 'UI' to 'GUI', it'll start
     def schedule_callback(scheduler_name: str, file_name: str):
         # file_name exists checked in gui
         scheduler1 = schedulers_list[schedulers_name.index(scheduler_name)]()
-        processes1 = read_from_file(file_name)
-        for pro in processes1:
-            scheduler1.add_process(pro)
-        return scheduler1.get_output(), scheduler1.get_gant()
+        return SimulationRun(scheduler1, file_name, results)  # same file and scheduler as before: no simulation
     schedulers_list = ScheduleMother.__subclasses__()
     schedulers_name = [x.name for x in ScheduleMother.__subclasses__()]
     win = Panel(
@@ -1,14 +1,145 @@
 # Save & Load data to or from files
 import os.path
-from typing import Generator, Dict
+import mmap
+import struct
+import hashlib
+from array import array
+from contextlib import contextmanager
+from typing import Generator, Dict, List, Tuple, Iterable, Iterator, Any, Optional
 import pickle
+try:
+    import fcntl  # file locks, posix only
+except ImportError:
+    fcntl = None
+
+COMPACT_MIN = 1 << 20  # bytes of dead values in .bin before a compaction is considered
+COMPACT_RATIO = 0.5  # compact when dead values are more than this part of .bin
+COMPACT_RECORDS = 1000  # merge .header records into its index when more than this and a tenth of the keys
+CACHE_BYTES = 64 << 20  # default memory budget of cached values, counted as their pickled size
+BATCH_BYTES = 4 << 20  # changed values are committed together once they reach this size, or on flush
+
+
+class Node:
+    length = None  # nodes saved before lengths were kept don't have it
+
+    def __init__(self, key, start, length=None):
+        self.key = key
+        self.start = start  # None until the first commit of a new key
+        self.length = length
+
+
+class HashIndex:
+    """
+    Read-only hash index from keys to places in .bin, at the start of .header, used through a memory map,
+    so opening it reads no key and a lookup reads a few slots.
+    Layout: header (magic, slots, count, live bytes, end), 'slots' u32 entry numbers + 1 (0: empty),
+    'count' entries of u64 (hash, key position, start, length), then the pickled keys in entry order.
+    Entries are sorted by their place in .bin, the log of .header continues at 'end'.
+    """
+    HEADER = struct.Struct("<8sQQQQ")
+    MAGIC = b"DBHASH01"
+    UNKNOWN = 2 ** 64 - 1  # length of a value saved before lengths were kept
+
+    def __init__(self, file):
+        self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        _, slots, self.count, self.live, self.end = self.HEADER.unpack_from(self._map)
+        self._view = memoryview(self._map)
+        position = self.HEADER.size
+        self._slots = self._view[position:position + 4 * slots].cast('I')
+        position += 4 * slots
+        self._entries = self._view[position:position + 32 * self.count].cast('Q')
+        self._mask = slots - 1
+
+    @classmethod
+    def is_index(cls, file) -> bool:
+        file.seek(0)
+        return file.read(len(cls.MAGIC)) == cls.MAGIC
+
+    @staticmethod
+    def _hash(data: bytes) -> int:
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+    def _key(self, entry: int) -> memoryview:
+        end = self._entries[4 * entry + 5] if entry + 1 < self.count else self.end
+        return self._view[self._entries[4 * entry + 1]:end]
+
+    def _node(self, key, entry: int) -> Node:
+        length = self._entries[4 * entry + 3]
+        return Node(key, self._entries[4 * entry + 2], None if length == self.UNKNOWN else length)
+
+    def get(self, key) -> Optional[Node]:
+        if not self.count:
+            return None
+        data = pickle.dumps(key, 4)
+        digest = self._hash(data)
+        slot = digest & self._mask
+        while self._slots[slot]:
+            entry = self._slots[slot] - 1
+            if self._entries[4 * entry] == digest and self._key(entry) == data:
+                return self._node(key, entry)
+            slot = (slot + 1) & self._mask
+        return None
+
+    def nodes(self) -> Iterator[Node]:
+        for entry in range(self.count):
+            yield self._node(pickle.loads(self._key(entry)), entry)
+
+    def close(self):
+        for view in (self._slots, self._entries, self._view):
+            view.release()
+        self._map.close()
+
+    @classmethod
+    def write(cls, filename: str, nodes: Iterable[Node], sync: bool = True):
+        """
+        Writes an index of the nodes, with an empty log after it
+        """
+        nodes = sorted(nodes, key=lambda e: e.start)
+        keys = [pickle.dumps(node.key, 4) for node in nodes]
+        slots = 8
+        while slots < len(nodes) * 2:  # at most half full, probes stay short
+            slots *= 2
+        table = array('I', [0]) * slots
+        entries = array('Q')
+        position = cls.HEADER.size + 4 * slots + 32 * len(nodes)
+        for number, (node, data) in enumerate(zip(nodes, keys)):
+            digest = cls._hash(data)
+            slot = digest & (slots - 1)
+            while table[slot]:
+                slot = (slot + 1) & (slots - 1)
+            table[slot] = number + 1
+            entries.extend((digest, position, node.start, cls.UNKNOWN if node.length is None else node.length))
+            position += len(data)
+        live = sum(node.length or 0 for node in nodes)
+        with open(filename, "wb") as file:
+            file.write(cls.HEADER.pack(cls.MAGIC, slots, len(nodes), live, position))
+            file.write(table.tobytes())
+            file.write(entries.tobytes())
+            file.write(b"".join(keys))
+            file.flush()
+            if sync:
+                os.fsync(file.fileno())
 
 
 class Database:
-    class Node:
-        def __init__(self, key, start):
-            self.key = key
-            self.start = start
+    """
+    Key-value storage on two files, values are pickled one after another in .bin
+    and .header is a HashIndex of the keys followed by a log of ('set', key, start, length)
+    and ('del', key) records appended by each commit. Opening it reads only the log,
+    keys are looked up in the index in place, changes since it was written are kept in memory,
+    and the log is merged into a new index when it grows too long.
+    A changed value is appended to .bin, never rewritten in place, so a flush costs the size of what changed,
+    the space of old values is reclaimed by a compaction when it grows too big.
+    Both files stay open while the instance lives, values are read from a memory map of .bin.
+    Values read or written are cached up to 'cache_bytes' (pickled size), least recently used first out.
+    Writes are batched: a set value is pickled at once, but written with the others by the next commit,
+    on flush, when 'batch_bytes' are waiting, or when it's evicted from the cache.
+    Many processes can use the same files: a commit holds an exclusive lock on .lock,
+    first reads the records other processes added since, then appends its values and records,
+    and syncs them to disk. A compaction or a merge replaces the files under the same lock,
+    the others see the new .header and reload it.
+    """
+    Node = Node  # headers pickled by older versions refer to Database.Node
 
     _dict = {}
 
@@ -24,23 +155,200 @@ class Database:
             return super(Database, cls).__new__(cls)
         return Database._dict[filename]
 
-    def __init__(self, filename: str = "database"):
+    def __init__(self, filename: str = "database", cache_bytes: int = CACHE_BYTES,
+                 batch_bytes: int = BATCH_BYTES, sync: bool = True):
+        """
+        :param filename: files are filename.bin, filename.header and filename.lock
+        :param cache_bytes: memory budget of cached values
+        :param batch_bytes: changed values waiting for a commit before one is done
+        :param sync: whether commits wait for the data to reach the disk (fsync)
+        """
         self.filename = os.path.abspath(filename)
         if self.filename in Database._dict:
             return  # This is not a new obj!
         Database._dict[self.filename] = self
-        self._change_flag: bool = False
-        self._change_header_flag: bool = False
-        self._header: Dict[str, Database.Node]
-        self._values = {}
-        if os.path.exists(self.filename+".header"):
-            with open(self.filename+".header", "rb") as file:
-                self._header = pickle.load(file)
+        self.cache_bytes = cache_bytes
+        self.batch_bytes = batch_bytes
+        self.sync = sync
+        self.hits = 0  # reads found in cache
+        self.misses = 0  # reads from file
+        self.evictions = 0  # values dropped from cache to stay in budget
+        self.commits = 0
+        self._dirty: Dict[Any, bytes] = {}  # pickled changed values, waiting for a commit
+        self._pending = 0  # sum of sizes in _dirty
+        self._log: List[Tuple] = []  # records not written to .header yet
+        self._values = {}  # cached values, least recently used first
+        self._sizes: Dict[Any, int] = {}  # pickled size of each cached value
+        self._cached = 0  # sum of _sizes
+        self._map: Optional[mmap.mmap] = None  # of .bin, remapped when a value past its end is read
+        self._index: Optional[HashIndex] = None
+        self._changes: Dict[Any, Optional[Node]] = {}  # nodes changed since the index was written, None: deleted
+        self._locked = 0  # depth of nested _lock calls
+        self._open()
+
+    def _open(self):
+        self._pid = os.getpid()  # a forked child opens its own files, a shared lock file would be no lock
+        self._lock_file = open(self.filename+".lock", "a+b")
+        with self._lock():
+            if not os.path.exists(self.filename+".header"):
+                open(self.filename+".bin", "wb").close()  # create it
+                HashIndex.write(self.filename+".header", [], self.sync)
+            self._open_data()
+
+    def _open_data(self):
+        """
+        Opens .bin and .header and reads the log, keeping the changes not committed yet
+        """
+        self._file = open(self.filename+".bin", "a+b")  # reads anywhere, writes always go to the end
+        self._header_file = open(self.filename+".header", "a+b")
+        if not HashIndex.is_index(self._header_file):  # a pickled dict of an older version, converted once
+            self._header_file.seek(0)
+            nodes = pickle.load(self._header_file)
+            self._file.close()
+            self._header_file.close()
+            HashIndex.write(self.filename+".header_tmp", nodes.values(), self.sync)
+            os.replace(self.filename+".header_tmp", self.filename+".header")
+            return self._open_data()
+        self._index = HashIndex(self._header_file)
+        self._changes = {}
+        self._count = self._index.count  # number of keys
+        self._live = self._index.live  # bytes of .bin used by the keys
+        self._header_end = self._index.end  # end of the last record read
+        self._records = 0  # records in .header after its index
+        self._replay()
+        for key in self._dirty:
+            if self._node(key) is None:
+                self._set_node(Node(key, None))
+        for record in self._log:  # deletes not committed yet, unless the key was set again after
+            if record[1] not in self._dirty and self._node(record[1]) is not None:
+                self._delete_node(record[1])
+
+    def _node(self, key) -> Optional[Node]:
+        if key in self._changes:
+            return self._changes[key]
+        return self._index.get(key)
+
+    def _set_node(self, node: Node):
+        old = self._node(node.key)
+        if old is None:
+            self._count += 1
+        elif old.start is not None:
+            self._live -= old.length or 0
+        self._changes[node.key] = node
+        if node.start is not None:
+            self._live += node.length
+
+    def _delete_node(self, key):
+        old = self._node(key)
+        self._count -= 1
+        if old.start is not None:
+            self._live -= old.length or 0
+        self._changes[key] = None
+
+    def _replay(self):
+        """
+        Applies the records after the last one read, cached values other processes changed are dropped
+        """
+        self._header_file.seek(self._header_end)
+        while True:
+            position = self._header_file.tell()
+            try:
+                record = pickle.load(self._header_file)
+            except (EOFError, pickle.UnpicklingError):  # the end, or a record cut by a crash
+                self._header_end = position
+                break
+            self._records += 1
+            key = record[1]
+            if key in self._dirty:  # ours is newer and replaces it on commit
+                continue
+            if key in self._values:
+                del self._values[key]
+                self._cached -= self._sizes.pop(key)
+            if record[0] == "set":
+                self._set_node(Node(*record[1:]))
+            elif self._node(key) is not None:
+                self._delete_node(key)
+
+    @contextmanager
+    def _lock(self):
+        if os.getpid() != self._pid:
+            self._reopen()
+        if fcntl is None or self._locked:
+            self._locked += 1
+            try:
+                yield
+            finally:
+                self._locked -= 1
+            return
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+        self._locked += 1
+        try:
+            yield
+        finally:
+            self._locked -= 1
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _reopen(self):
+        # after a fork, the inherited handles share their offsets and lock with the parent
+        self._close()
+        self._lock_file.close()
+        self._open()
+
+    def _catch_up(self):
+        """
+        Called under lock, loads what other processes committed since the last commit or read
+        """
+        if os.stat(self.filename+".header").st_ino != os.fstat(self._header_file.fileno()).st_ino:
+            if os.stat(self.filename+".bin").st_ino != os.fstat(self._file.fileno()).st_ino:
+                # compacted by another process, all places in file changed
+                for key in [key for key in self._values if key not in self._dirty]:
+                    del self._values[key]
+                    self._cached -= self._sizes.pop(key)
+            self._close()
+            self._open_data()
         else:
-            with open(self.filename+".header", "wb") as file:
-                self._header = {}
-                pickle.dump(self._header, file)
-            open(self.filename+".bin", "wb").close()  # create it
+            self._replay()
+
+    def refresh(self):
+        """
+        Loads keys and values other processes committed since the last commit
+        """
+        with self._lock():
+            self._catch_up()
+
+    def close(self):
+        """
+        Saves everything and closes the files, the instance can't be used after it
+        """
+        self.flush()
+        self._close()
+        self._lock_file.close()
+        del Database._dict[self.filename]
+
+    def _close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        self._file.close()
+        self._header_file.close()
+
+    def _read(self, node: Node) -> Any:
+        if node.length is None:  # unknown length, unpickle from the file itself and measure it
+            self._file.seek(node.start)
+            value = pickle.load(self._file)
+            node.length = self._file.tell() - node.start
+            self._live += node.length
+            self._changes[node.key] = node
+            return value
+        end = node.start + node.length
+        if self._map is None or len(self._map) < end:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return pickle.loads(self._map[node.start:end])
 
     def __getitem__(self, item):
         """
@@ -48,64 +356,215 @@ class Database:
         :param item: key of a value
         :return: value
         """
-        if item not in self._header:
+        if item in self._values:
+            self.hits += 1
+            value = self._values[item] = self._values.pop(item)  # now the most recent
+            return value
+        node = self._node(item)
+        if node is None:
             raise IndexError(f"key {item} not found!")
-        node = self._header[item]
-        if item not in self._values:
-            with open(self.filename+".bin", "rb") as file:
-                file.seek(node.start)
-                self._values[item] = pickle.load(file)
-        return self._values[item]
+        self.misses += 1
+        value = self._read(node)
+        self._cache(item, value, node.length)
+        return value
     get = __getitem__
 
+    def get_many(self, items: Iterable) -> List:
+        """
+        Get values of many keys, the ones not in memory are read in order of their place in file
+        :param items: keys of values
+        :return: values, in order of keys
+        """
+        items = list(items)
+        values = {}
+        missing = {}
+        for item in items:
+            if item in values or item in missing:
+                continue
+            if item in self._values:
+                self.hits += 1
+                values[item] = self._values[item] = self._values.pop(item)
+                continue
+            node = self._node(item)
+            if node is None:
+                raise IndexError(f"key {item} not found!")
+            missing[item] = node
+        for item, node in sorted(missing.items(), key=lambda e: e[1].start):
+            self.misses += 1
+            values[item] = self._read(node)
+            self._cache(item, values[item], node.length)
+        return [values[item] for item in items]
+
     def __setitem__(self, key, value):
         """
         Save or replace a value with a key
         :param key: key of value, you can retrieve value with this key
         :param value: the value to be saved,
         """
-        if key in self._header:
-            self._values[key] = value
-            self._change_flag = True
-        else:
-            with open(self.filename+".bin", "ab") as file:
-                new = Database.Node(key, file.tell())
-                self._header[key] = new
-                self._change_header_flag = True
-                self._values[key] = value
-                pickle.dump(value, file)
+        self.set_many(((key, value),))
     set = __setitem__
 
+    def set_many(self, items: Iterable[Tuple[Any, Any]]):
+        """
+        Save or replace many values, they are written together by the next commit
+        :param items: (key, value) pairs, or a dict
+        """
+        if isinstance(items, dict):
+            items = items.items()
+        for key, value in items:
+            data = pickle.dumps(value)  # changes made to the value after this are not saved
+            if key not in self._dirty and self._node(key) is None:
+                self._changes[key] = Node(key, None)
+                self._count += 1
+            self._pending += len(data) - len(self._dirty.get(key, b""))
+            self._dirty[key] = data
+            self._cache(key, value, len(data))
+        if self._pending > self.batch_bytes:
+            self.commit()
+
+    def __delitem__(self, key):
+        """
+        Delete a key and its value, the space in file is freed by a later compaction
+        :param key: key of value
+        """
+        if self._node(key) is None:
+            raise IndexError(f"key {key} not found!")
+        self._delete_node(key)
+        if key in self._values:
+            del self._values[key]
+            self._cached -= self._sizes.pop(key)
+        self._pending -= len(self._dirty.pop(key, b""))
+        self._log.append(("del", key))
+    delete = __delitem__
+
     def __contains__(self, item):
-        return item in self._header
+        return item in self._values or self._node(item) is not None
+
+    def __len__(self):
+        return self._count
 
     def keys(self) -> Generator:
-        for node in self._header:
+        for node in self._nodes():
             yield node.key
 
+    def _nodes(self) -> List[Node]:
+        nodes = [node for node in self._index.nodes() if node.key not in self._changes]
+        nodes.extend(node for node in self._changes.values() if node is not None)
+        return nodes
+
+    def _cache(self, key, value, size: int):
+        if key in self._values:
+            del self._values[key]
+            self._cached -= self._sizes[key]
+        self._values[key] = value
+        self._sizes[key] = size
+        self._cached += size
+        if self._cached > self.cache_bytes:
+            self._evict()
+
+    def _evict(self):
+        evicted = []
+        for key in self._values:  # least recent first
+            if self._cached <= self.cache_bytes:
+                break
+            self._cached -= self._sizes.pop(key)
+            evicted.append(key)
+        for key in evicted:
+            del self._values[key]
+        self.evictions += len(evicted)
+        if any(key in self._dirty for key in evicted):
+            self.commit()  # write back, the evicted values are read from file from now on
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters of the value cache and commits
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "commits": self.commits,
+                "cached": len(self._values), "cached_bytes": self._cached, "cache_bytes": self.cache_bytes}
+
+    def commit(self):
+        """
+        Writes every change as one batch: under the lock, the changes of other processes are loaded,
+        changed values are appended to .bin, then their records to .header, each synced before the next,
+        a crash leaves either the whole batch or, at worst, values no record points to
+        """
+        if not self._dirty and not self._log:
+            return
+        with self._lock():
+            self._catch_up()
+            self._file.seek(0, os.SEEK_END)
+            start = self._file.tell()
+            self._file.write(b"".join(self._dirty.values()))
+            for key, data in self._dirty.items():
+                self._set_node(Node(key, start, len(data)))
+                self._log.append(("set", key, start, len(data)))
+                start += len(data)
+            self._sync(self._file)
+            self._header_file.truncate(self._header_end)  # a record cut by a crash would hide the ones after it
+            self._header_file.write(b"".join(pickle.dumps(record) for record in self._log))
+            self._sync(self._header_file)
+            self._header_end = self._header_file.tell()
+            self._records += len(self._log)
+        self._dirty.clear()
+        self._pending = 0
+        self._log.clear()
+        self.commits += 1
+
+    def _sync(self, file):
+        file.flush()
+        if self.sync:
+            os.fsync(file.fileno())
+
     def flush(self):
         """
-        Flushes buffer and saves everything to file
-        """
-        if self._change_flag:
-            self._change_header_flag = True
-            with open(self.filename+".bin_tmp", "wb") as tmp_file, open(self.filename+".bin", "rb") as file:
-                for key, node in self._header.items():
-                    if key in self._values:
-                        data = self._values[key]
-                    else:
-                        file.seek(node.start)
-                        data = pickle.load(file)
-                    node.start = tmp_file.tell()
-                    pickle.dump(data, tmp_file)
-            os.remove(self.filename + ".bin")
-            os.rename(self.filename + ".bin_tmp", self.filename + ".bin")
+        Flushes buffer and saves everything to file,
+        changed values are appended and only their records are added to the header
+        """
+        self.commit()
+        size = os.path.getsize(self.filename+".bin")
+        garbage = size - self._live  # bytes no key uses
+        if garbage > COMPACT_MIN and garbage > size * COMPACT_RATIO:
+            self.compact()
+        elif self._records > max(COMPACT_RECORDS, self._count // 10):
+            self.merge()
+
+    def merge(self):
+        """
+        Writes a new index with the records of the log in it, .bin is not touched
+        """
+        with self._lock():
+            self.commit()
+            self._catch_up()
+            HashIndex.write(self.filename+".header_tmp", self._nodes(), self.sync)
+            os.replace(self.filename+".header_tmp", self.filename+".header")
+            self._close()
+            self._open_data()
 
-        if self._change_header_flag:
-            with open(self.filename+".header_tmp", "wb") as file:
-                pickle.dump(self._header, file)
-            os.remove(self.filename+".header")
-            os.rename(self.filename+".header_tmp", self.filename+".header")
+    def compact(self):
+        """
+        Rewrites .bin with live values only, copying their bytes without unpickling them,
+        and .header as an index with an empty log, the new files replace the old ones atomically
+        """
+        with self._lock():
+            self.commit()
+            self._catch_up()
+            nodes = sorted(self._nodes(), key=lambda e: e.start)  # one pass over the old file
+            with open(self.filename+".bin_tmp", "wb") as tmp_file:
+                for node in nodes:
+                    self._file.seek(node.start)
+                    if node.length is None:  # measure it by reading the value once
+                        pickle.load(self._file)
+                        node.length = self._file.tell() - node.start
+                        self._file.seek(node.start)
+                    node.start = tmp_file.tell()
+                    tmp_file.write(self._file.read(node.length))
+                self._sync(tmp_file)
+            HashIndex.write(self.filename+".header_tmp", nodes, self.sync)
+            # readers of the old header still have the old .bin open, the new .bin must be in place first
+            os.replace(self.filename + ".bin_tmp", self.filename + ".bin")
+            os.replace(self.filename+".header_tmp", self.filename+".header")
+            self._close()
+            self._open_data()
 
     def clear_cache(self):
         """
@@ -113,3 +572,5 @@ class Database:
         """
         self.flush()  # save everything
         self._values.clear()  # delete cache
+        self._sizes.clear()
+        self._cached = 0
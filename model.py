@@ -1,5 +1,13 @@
 import os.path
-from typing import List, Tuple, Optional
+import sys
+import mmap
+import struct
+import threading
+from array import array
+from heapq import heappush, heappop
+from collections import deque
+from collections.abc import Sequence as _Sequence
+from typing import List, Tuple, Optional, Dict, Deque, Iterable, Iterator, Union, Sequence, Callable
 
 
 class Process:
@@ -10,6 +18,8 @@ class Process:
     RUN = States()  # Current Running Process
     EXIT = States()  # Finished
 
+    __slots__ = ('name', 'enter', 'calc', 'state', 'response', 'waiting')
+
     def __init__(self, name: str, enter_time: int, calc_time: int):
         self.name = name
         self.enter = enter_time
@@ -19,401 +29,1100 @@ class Process:
         self.waiting: Optional[int] = None
 
 
-class ScheduleMother:
+UNSET = -2 ** 63  # 'response' and 'waiting' of a row that has not been simulated yet
+
+
+class ProcessTable:
     """
-        Mother Class Of Process Schedulers.
-        Each Scheduling Method Should Be Defined By Creating A Subclass Of This Class.
+        Columnar Storage Of Processes, Row i Is One Process.
+        Names Are Packed Into One Byte Buffer And Times Into Typed 64-bit Arrays,
+        So A Row Costs 40 Bytes Plus Its Name, Instead Of A Python Object With Its Own Attributes.
+        table[i] Returns A ProcessView Of Row i, Iterating Yields Views Of Every Row.
+        Tables Loaded By load_binary_trace Keep Their Input Columns On The Memory-Mapped File,
+        Those Can't Be Appended To, Only 'response' And 'waiting' Are Written.
     """
-    name = ""  # name of scheduler
 
-    def add_process(self, process: Process):
-        raise NotImplemented
+    def __init__(self):
+        self._names = bytearray()  # utf-8 names one after another
+        self._name_ends = array('Q')  # name i ends at _name_ends[i]
+        self._name_ids: Optional[Sequence[int]] = None  # name index of each row, None: row i has name i
+        self._order: Optional[Sequence[int]] = None  # cached arrival_order
+        self.enter = array('q')
+        self.calc = array('q')
+        self.response = array('q')  # UNSET until simulated
+        self.waiting = array('q')  # UNSET until simulated
+
+    @classmethod
+    def from_columns(cls, names: Sequence[int], name_ends: Sequence[int], enter: Sequence[int], calc: Sequence[int],
+                     name_ids: Optional[Sequence[int]] = None,
+                     order: Optional[Sequence[int]] = None) -> 'ProcessTable':
+        """
+            Builds A Table On Existing Columns (Arrays Or Memoryviews) Without Copying Them.
+            :param names: utf-8 names one after another
+            :param name_ends: end of each name in 'names'
+            :param enter: enter time of each row
+            :param calc: calculate time of each row
+            :param name_ids: index of the name of each row, when names are shared between rows
+            :param order: rows in order of enter time, if already known
+        """
+        table = cls()
+        table._names, table._name_ends, table._name_ids, table._order = names, name_ends, name_ids, order
+        table.enter, table.calc = enter, calc
+        table.response = array('q', [UNSET]) * len(enter)
+        table.waiting = array('q', [UNSET]) * len(enter)
+        return table
+
+    @classmethod
+    def from_processes(cls, processes: Iterable[Process]) -> 'ProcessTable':
+        table = cls()
+        for process in processes:
+            table.append(process.name, process.enter, process.calc)
+        return table
+
+    def append(self, name: Union[str, bytes], enter: int, calc: int):
+        self._names += name.encode() if isinstance(name, str) else name
+        self._name_ends.append(len(self._names))
+        if self._name_ids is not None:
+            self._name_ids.append(len(self._name_ends) - 1)
+        self._order = None
+        self.enter.append(enter)
+        self.calc.append(calc)
+        self.response.append(UNSET)
+        self.waiting.append(UNSET)
+
+    def extend(self, table: 'ProcessTable'):
+        """
+            Appends Copies Of Every Row Of Another Table, Column By Column (Results Are Not Copied).
+        """
+        if table._name_ids is not None or self._name_ids is not None:  # names are shared, copy them one by one
+            for index in range(len(table)):
+                self.append(table.name(index), table.enter[index], table.calc[index])
+            return
+        offset = len(self._names)
+        self._names += table._names
+        self._name_ends.extend(end + offset for end in table._name_ends)
+        self._order = None
+        self.enter.extend(table.enter)
+        self.calc.extend(table.calc)
+        unset = array('q', [UNSET]) * len(table)
+        self.response.extend(unset)
+        self.waiting.extend(unset)
+
+    def name(self, index: int) -> str:
+        if self._name_ids is not None:
+            index = self._name_ids[index]
+        start = self._name_ends[index - 1] if index else 0
+        return str(self._names[start:self._name_ends[index]], 'utf-8')
+
+    def names(self) -> Iterator[str]:
+        if self._name_ids is not None:
+            yield from map(self.name, range(len(self)))
+            return
+        start = 0
+        for end in self._name_ends:
+            yield str(self._names[start:end], 'utf-8')
+            start = end
 
-    def get_output(self) -> List[Process]:
+    def column(self, attribute: str) -> Iterable:
         """
-            Returns A List Of Processes That 'response' And 'waiting' Attributes Are Set.
+            Values Of One Attribute ('name', 'enter', 'calc', 'response' Or 'waiting') For Every Row.
         """
-        raise NotImplemented
+        if attribute == "name":
+            return self.names()
+        if attribute in ("enter", "calc", "response", "waiting"):
+            return getattr(self, attribute)
+        raise AttributeError(f"ProcessTable has no column {attribute}")
 
-    def get_gant(self) -> List[Tuple[int, str]]:
+    def copy(self) -> 'ProcessTable':
         """
-            Returns A List Of Tuples Of An Integer And An String,
-            Integer Is The Starting Time Of A Process
-            String Is The Name Of That Process.
+            A Table Of Its Own With The Same Rows And Results, Its Columns Are Arrays Even If These Are Mapped.
+        """
+        state = self.__getstate__()  # mapped columns are copied already
+        for key, value in state.items():
+            if value is getattr(self, key) and isinstance(value, (array, bytearray, list)):
+                state[key] = value[:]
+        table = ProcessTable.__new__(ProcessTable)
+        table.__dict__.update(state)
+        return table
+
+    def arrival_order(self) -> Sequence[int]:
+        """
+            Row Indexes In Order Of Enter Time (Stable), Traces Are Usually Sorted Already
+            And Then This Is Just A range, Without Building A List. Cached Until The Next Append.
         """
-        raise NotImplemented
+        if self._order is None:
+            enter = self.enter
+            if all(enter[i] <= enter[i + 1] for i in range(len(enter) - 1)):
+                self._order = range(len(enter))
+            else:
+                self._order = sorted(range(len(enter)), key=enter.__getitem__)
+        return self._order
 
+    def nbytes(self) -> int:
+        """
+            Bytes Used By The Columns.
+        """
+        columns = [self._name_ends, self.enter, self.calc, self.response, self.waiting]
+        if self._name_ids is not None:
+            columns.append(self._name_ids)
+        return len(self._names) + sum(col.itemsize * len(col) for col in columns)
+
+    def __len__(self):
+        return len(self.enter)
+
+    def __getitem__(self, index: int) -> 'ProcessView':
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ProcessTable index out of range")
+        return ProcessView(self, index)
+
+    def __iter__(self) -> Iterator['ProcessView']:
+        for index in range(len(self)):
+            yield ProcessView(self, index)
+
+    def __getstate__(self) -> dict:
+        # memoryviews on a mapped trace can't be pickled, their contents are copied into arrays
+        state = self.__dict__.copy()
+        for key, value in state.items():
+            if isinstance(value, memoryview):
+                if value.format in ('B', 'c'):
+                    state[key] = bytearray(value)
+                else:
+                    column = array(value.format)
+                    column.frombytes(value.cast('B'))
+                    state[key] = column
+        return state
 
-class ScheduleFCFS(ScheduleMother):
-    name = "FCFS"  # name of scheduler
 
-    def __init__(self):
-        self.processes = []
-        self.gant_output = []
-        self.calc = False  # Whether a simulation has been done or not
+class ProcessView:
+    """
+        A Row Of A ProcessTable With The Attributes Of A Process, Reads And Writes Go To The Table.
+    """
+    __slots__ = ('table', 'index')
 
-    def add_process(self, process: Process):
-        self.processes.append(process)
+    def __init__(self, table: ProcessTable, index: int):
+        self.table = table
+        self.index = index
 
-    def _calc(self):
-        self.gant_output.clear()
-        # we need a simple queue to add processes into it in order of getting in
-        queue: List[Process] = sorted(self.processes, key=lambda e: e.enter)
-        # queue.pop(0) will return first element in queue,
-
-        time = queue[0].enter  # time starts when first process entered
-        while queue:  # until there is process
-            process = queue.pop(0)
-            self.gant_output.append((time, process.name))
-            time += process.calc
-            process.response = time - process.enter  # exit time - enter time
-            process.waiting = time - process.calc - process.enter  # exit - calculate time - enter
-        self.gant_output.append((time, 'END'))
-        self.calc = True
-
-    def get_output(self) -> List[Process]:
-        if not self.calc:
-            self._calc()
-        return self.processes.copy()
+    @property
+    def name(self) -> str:
+        return self.table.name(self.index)
 
-    def get_gant(self) -> List[Tuple[int, str]]:
-        if not self.calc:
-            self._calc()
-        return self.gant_output.copy()
+    @property
+    def enter(self) -> int:
+        return self.table.enter[self.index]
 
+    @property
+    def calc(self) -> int:
+        return self.table.calc[self.index]
 
-class ScheduleRR(ScheduleMother):
-    name = 'RR'
+    @property
+    def response(self) -> Optional[int]:
+        value = self.table.response[self.index]
+        return None if value == UNSET else value
 
-    def __init__(self, quant: int = 10, change_time: int = 2):
-        self.processes: List[Process] = []
-        self.gant_chart = []
+    @response.setter
+    def response(self, value: Optional[int]):
+        self.table.response[self.index] = UNSET if value is None else value
+
+    @property
+    def waiting(self) -> Optional[int]:
+        value = self.table.waiting[self.index]
+        return None if value == UNSET else value
+
+    @waiting.setter
+    def waiting(self, value: Optional[int]):
+        self.table.waiting[self.index] = UNSET if value is None else value
+
+    @property
+    def state(self) -> Process.States:
+        return Process.HALT if self.table.response[self.index] == UNSET else Process.EXIT
+
+
+class Job:
+    """
+        A Process Inside The Simulation, With The Time It Still Needs.
+        'ref' Is What The Caller Uses To Know The Process (A Table Row, Or A Process Object Online).
+        'sequence' Is Renewed On Every Push, Policies Use It To Keep Equal Keys In Insertion Order.
+        'level' Is Only Used By Multilevel Policies.
+    """
+    __slots__ = ('ref', 'enter', 'calc', 'remaining', 'sequence', 'level')
+
+    def __init__(self, ref, enter: int, calc: int, sequence: int):
+        self.ref = ref
+        self.enter = enter
+        self.calc = calc
+        self.remaining = calc
+        self.sequence = sequence
+        self.level = 0
+
+
+class ReadyQueue:
+    """
+        Policy Of A Scheduler: Holds Ready Jobs And Decides Which One Runs Next And For How Long.
+        The Simulation Kernel In ScheduleMother Does Everything Else.
+    """
+    preemptive = False  # whether an arriving process interrupts the running one to be compared with it
+
+    def push(self, job: Job):
+        raise NotImplementedError
+
+    def pop(self, time: int) -> Job:
+        """
+            Removes And Returns The Job To Run At 'time', Only Called When The Queue Is Not Empty.
+        """
+        raise NotImplementedError
+
+    def requeue(self, job: Job):
+        """
+            Puts Back A Job That Was Interrupted Before Its Exit.
+        """
+        self.push(job)
+
+    def quantum(self, job: Job) -> Optional[int]:
+        """
+            Maximum Time The Job Runs Before Being Requeued, None Means Until Its Exit.
+        """
+        return None
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class FIFOQueue(ReadyQueue):
+    """
+        First Come First Served, With An Optional Time Quantum (Round Robin).
+    """
+
+    def __init__(self, quant: Optional[int] = None):
+        self._queue: Deque[Job] = deque()
         self._quant = quant
-        self._change_time = change_time
-        self._is_calc = False
 
-    def add_process(self, process: Process):
-        self.processes.append(process)
-        self._is_calc = False
+    def push(self, job: Job):
+        self._queue.append(job)
 
-    def get_output(self) -> List[Process]:
-        if not self._is_calc:
-            self._calc()
-        return self.processes.copy()
+    def pop(self, time: int) -> Job:
+        return self._queue.popleft()
 
-    def get_gant(self):
-        if not self._is_calc:
-            self._calc()
-        return self.gant_chart
+    def quantum(self, job: Job) -> Optional[int]:
+        return self._quant
 
-    def _calc(self):
-        self.gant_chart.clear()
-        if not self.processes:
-            return
-        queue: List[Tuple[Process, int]] = [(i, i.calc) for i in sorted(self.processes, key=lambda e: e.enter)]
-        time = queue[0][0].enter
-        while queue:
-            process, left_time = queue.pop(0)
-            self.gant_chart.append((time, process.name))
-            if left_time <= self._quant:
-                time += left_time
-                process.response = time - process.enter  # exit time - enter time
-                process.waiting = time - process.calc - process.enter  # exit - calculate time - enter
-            else:
-                time += self._quant
-                queue.append((process, left_time-self._quant))
-            self.gant_chart.append((time, 'QUANT'))
-            time += self._change_time
-        self.gant_chart.pop()
-        self.gant_chart.append((time-self._change_time, "END"))
+    def __len__(self):
+        return len(self._queue)
 
 
-class ScheduleSPN(ScheduleMother):
-    name = "SPN/SJF"
+class LIFOQueue(ReadyQueue):
+    """
+        Last Come First Served, The Newest Ready Job Runs First.
+    """
 
     def __init__(self):
-        self.queue1: List[Process] = []
-        self.gant_chart = []
-        self._is_calc = False
+        self._stack: List[Job] = []
 
-    def get_gant(self):
-        if not self._is_calc:
-            self._calc()
-        return self.gant_chart
+    def push(self, job: Job):
+        self._stack.append(job)
 
-    def add_process(self, process: Process):
-        self.queue1.append(process)
-        self._is_calc = False
+    def pop(self, time: int) -> Job:
+        return self._stack.pop()
 
-    def get_output(self):
-        if not self._is_calc:
-            self._calc()
-        return self.queue1.copy()
+    def __len__(self):
+        return len(self._stack)
 
-    def _calc(self):
-        self.gant_chart.clear()
-        self._is_calc = True
-        queue1 = sorted(self.queue1, key=lambda e: e.enter)
-        priority_queue = []
-        time = queue1[0].enter
-        while queue1 or priority_queue:
-            while queue1 and queue1[0].enter <= time:
-                self._priority_add_helper(priority_queue, queue1.pop(0))
-            time_left, elem = priority_queue.pop(0)
-            self.gant_chart.append((time, elem.name))
-            time += time_left
-            elem.response = time - elem.enter  # exit time - enter time
-            elem.waiting = time - elem.calc - elem.enter  # exit - calculate time - enter
-        self.gant_chart.append((time, "END"))
 
-    @staticmethod
-    def _priority_add_helper(queue: List[Tuple[int, Process]], element: Process, time_left: int = 0):
-        if time_left == 0:
-            time_left = element.calc
-        if queue:
-            for index, (time_left1, elem) in enumerate(queue):
-                if time_left1 > time_left:
-                    queue.insert(index, (time_left, element))
-                    return
-        queue.append((time_left, element))
+class BurstHeap(ReadyQueue):
+    """
+        Ready Queue On A Binary Heap, Keyed On (Burst, Arrival, Sequence).
+        Jobs With Equal Burst Come Out In The Same Order They Were Pushed,
+        So Push And Pop Are O(log n) Instead Of A Linear Scan Of A Sorted List.
+    """
 
+    def __init__(self):
+        self._heap: List[tuple] = []
 
-class ScheduleSRT(ScheduleMother):
-    name = "SRT"
+    def _key(self, job: Job) -> tuple:
+        return job.remaining, job.enter, job.sequence
 
-    def __init__(self):
-        self.queue1: List[Process] = []
-        self.gant_chart = []
-        self._is_calc = False
+    def push(self, job: Job):
+        heappush(self._heap, (self._key(job), job))  # keys are unique, jobs are never compared
 
-    def get_gant(self):
-        if not self._is_calc:
-            self._calc()
-        return self.gant_chart
+    def pop(self, time: int) -> Job:
+        return heappop(self._heap)[1]
 
-    def add_process(self, process: Process):
-        self.queue1.append(process)
-        self._is_calc = False
+    def __len__(self):
+        return len(self._heap)
 
-    def get_output(self):
-        if not self._is_calc:
-            self._calc()
-        return self.queue1.copy()
 
-    def _calc(self):
-        self.gant_chart.clear()
-        self._is_calc = True
-        queue1 = sorted(self.queue1, key=lambda e: e.enter)
-        priority_queue = []
-        time = queue1[0].enter
-        old_elem = None
-        while queue1 or priority_queue:
-            while queue1 and queue1[0].enter <= time:
-                self._priority_add_helper(priority_queue, queue1.pop(0))
-            time_left, elem = priority_queue.pop(0)
-            if (old_elem and old_elem is not elem) or not old_elem:  # not elem is for first time
-                self.gant_chart.append((time, elem.name))
-            old_elem = elem
-            if queue1 and queue1[0].enter < time_left+time:
-                step = queue1[0].enter - time
-                time += step
-                self._priority_add_helper(priority_queue, elem, time_left-step)
-            else:
-                # this should end for because it's our first priority
-                time += time_left
-                elem.response = time - elem.enter  # exit time - enter time
-                elem.waiting = time - elem.calc - elem.enter  # exit - calculate time - enter
-        self.gant_chart.append((time, "END"))
+class RemainingTimeHeap(BurstHeap):
+    """
+        Preemptive Version Of BurstHeap, Keyed On (Remaining Time, Sequence).
+        An Interrupted Job Is Pushed Back Before The Arrivals That Interrupted It,
+        So It Wins Ties Against Them But Loses Ties Against Jobs That Were Already Waiting.
+    """
+    preemptive = True
 
-    @staticmethod
-    def _priority_add_helper(queue: List[Tuple[int, Process]], element: Process, time_left: int = 0):
-        if time_left == 0:
-            time_left = element.calc
-        if queue:
-            for index, (time_left1, elem) in enumerate(queue):
-                if time_left1 > time_left:
-                    queue.insert(index, (time_left, element))
-                    return
-        queue.append((time_left, element))
+    def _key(self, job: Job) -> tuple:
+        return job.remaining, job.sequence
 
 
-class ScheduleHRRN(ScheduleMother):
-    name = "HRRN"
+class ResponseRatioIndex(ReadyQueue):
+    """
+        Ready Queue For HRRN, Pops The Job With The Highest Response Ratio At A Given Time.
+        Response Ratio Is (waiting + calc) / calc, Among Jobs With The Same Calc Time
+        The Oldest One Always Has The Highest Ratio, So Jobs Are Grouped By Calc Time
+        And Only The Head Of Each Group Is Compared, Pop Costs O(number of distinct calc times).
+        Equal Ratios Are Broken By Arrival, Then By Insertion Order.
+    """
 
     def __init__(self):
-        self.queue1: List[Process] = []
-        self.gant_chart = []
-        self._is_calc = False
+        self._groups: Dict[int, Deque[Job]] = {}  # calc time -> jobs by arrival
+        self._size = 0
 
-    def get_gant(self):
-        if not self._is_calc:
-            self._calc()
-        return self.gant_chart
+    def push(self, job: Job):
+        """
+            Jobs Must Be Pushed In Order Of Their Enter Time.
+        """
+        group = self._groups.get(job.calc)
+        if group is None:
+            group = self._groups[job.calc] = deque()
+        group.append(job)
+        self._size += 1
+
+    def pop(self, time: int) -> Job:
+        best_calc = best = None
+        for calc, group in self._groups.items():
+            head = group[0]
+            if best is None or self._is_better(head, best, time):
+                best_calc, best = calc, head
+        group = self._groups[best_calc]
+        group.popleft()
+        if not group:
+            del self._groups[best_calc]
+        self._size -= 1
+        return best
 
-    def add_process(self, process: Process):
-        self.queue1.append(process)
-        self._is_calc = False
+    @staticmethod
+    def _is_better(job1: Job, job2: Job, time: int) -> bool:
+        # compares (time - enter + calc) / calc of both, multiplied out to stay exact on integers
+        w1 = (time - job1.enter + job1.calc) * job2.calc
+        w2 = (time - job2.enter + job2.calc) * job1.calc
+        if w1 != w2:
+            return w1 > w2
+        return (job1.enter, job1.sequence) < (job2.enter, job2.sequence)
 
-    def get_output(self):
-        if not self._is_calc:
-            self._calc()
-        return self.queue1.copy()
+    def __len__(self):
+        return self._size
 
-    def _calc(self):
-        self.gant_chart.clear()
-        self._is_calc = True
-        queue1: List[Process] = sorted(self.queue1, key=lambda e: e.enter)
-        priority_queue = []
-        time = queue1[0].enter
-        while queue1 or priority_queue:
-            while queue1 and queue1[0].enter <= time:
-                self._priority_add_helper(priority_queue, queue1.pop(0), time)
-            elem = priority_queue.pop(0)
-            self.gant_chart.append((time, elem.name))
-            time += elem.calc
-            elem.response = time - elem.enter  # exit time - enter time
-            elem.waiting = time - elem.calc - elem.enter  # exit - calculate time - enter
-        self.gant_chart.append((time, "END"))
 
-    @staticmethod
-    def _priority_add_helper(queue: List[Process], element: Process, time: int = 0):
-        w1 = ((time - element.enter) + element.calc) / element.calc
-        if queue:
-            for index, elem in enumerate(queue):
-                w2 = ((time - elem.enter) + elem.calc) / elem.calc
-                if w1 > w2:
-                    queue.insert(index, element)
-                    return
-        queue.append(element)
+class FeedbackQueues(ReadyQueue):
+    """
+        FIFO Queues Of A Multilevel Scheduler, Level 0 Has The Highest Priority.
+        New Jobs Enter Level 0, A Job That Uses Its Whole Quantum Moves One Level Down,
+        Jobs On The Last Level Are Served Round Robin.
+    """
 
+    def __init__(self, levels: int = 3, quant: int = 5):
+        self._levels: List[Deque[Job]] = [deque() for _ in range(levels)]
+        self._quant = quant
+        self._size = 0
+
+    def push(self, job: Job):
+        self._levels[job.level].append(job)
+        self._size += 1
+
+    def pop(self, time: int) -> Job:
+        for queue in self._levels:
+            if queue:
+                self._size -= 1
+                return queue.popleft()
+        raise IndexError("pop from empty FeedbackQueues")
+
+    def requeue(self, job: Job):
+        job.level = min(job.level + 1, len(self._levels) - 1)
+        self.push(job)
+
+    def quantum(self, job: Job) -> Optional[int]:
+        return self._quant
+
+    def __len__(self):
+        return self._size
+
+
+GANT = "gant"  # simulation event: (GANT, (start time, name)), a gant chart entry
+EXIT = "exit"  # simulation event: (EXIT, (process, response, waiting)), a process has finished
 
-class ScheduleFB(ScheduleMother):
-    name = "FB"
+
+class GantChart:
+    """
+        Gant Chart Of A Simulation As Runs In Three Typed Columns: 'starts', 'ends' And 'ids',
+        The Row Of The Process In 'table', Names Are Read From The Table Only When Needed.
+        A Process That Runs Again Right When Its Previous Run Ends Extends That Run,
+        So A Run Costs 20 Bytes Whatever The Number Of Slices It Was Made Of.
+        Idle Time Is The Gap Between A Run's End And The Next One's Start.
+    """
+
+    def __init__(self, table: ProcessTable, marker: Optional[str] = None):
+        self.table = table
+        self.marker = marker  # legacy entry between runs, like 'QUANT'
+        self.starts = array('q')
+        self.ends = array('q')
+        self.ids = array('I')
+
+    @classmethod
+    def from_legacy(cls, gant: Sequence[Tuple[int, str]], markers: Sequence[str] = ("QUANT", "END")) -> 'GantChart':
+        """
+            Runs Of A List Of (Time, Name) Tuples, Each Entry Runs Until The Next One, Markers Only End A Run.
+            Names Are Kept In A Table Of Their Own, One Row Per Distinct Name.
+        """
+        table = ProcessTable()
+        rows: Dict[str, int] = {}
+        chart = cls(table)
+        for index in range(len(gant) - 1):
+            start, name = gant[index]
+            if name in markers:
+                continue
+            if name not in rows:
+                rows[name] = len(table)
+                table.append(name, 0, 0)
+            chart.add(start, gant[index + 1][0], rows[name])
+        return chart
+
+    def add(self, start: int, end: int, row: int):
+        ends = self.ends
+        if ends and ends[-1] == start and self.ids[-1] == row:
+            ends[-1] = end
+            return
+        self.starts.append(start)
+        ends.append(end)
+        self.ids.append(row)
+
+    def columns(self) -> Tuple[memoryview, memoryview, memoryview]:
+        """
+            Read-Only Views Of (starts, ends, ids), No Copy Is Made, The Chart Can't Grow While They're Held.
+        """
+        return (memoryview(self.starts).toreadonly(), memoryview(self.ends).toreadonly(),
+                memoryview(self.ids).toreadonly())
+
+    def name(self, index: int) -> str:
+        return self.table.name(self.ids[index])
+
+    @property
+    def end(self) -> int:
+        return self.ends[-1] if self.ends else 0
+
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in (self.starts, self.ends, self.ids))
+
+    def legacy(self) -> 'LegacyGant':
+        return LegacyGant(self)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> Tuple[int, int, str]:
+        """
+            (start, end, name) Of A Run.
+        """
+        return self.starts[index], self.ends[index], self.name(index)
+
+
+class LegacyGant(_Sequence):
+    """
+        Read-Only List Of (Time, Name) Tuples Of A GantChart, In The Format Schedulers Gave Before:
+        Start And Name Of Each Run, The Marker At The End Of Each Run But The Last One If There Is One,
+        Then (End, 'END'). Tuples Are Made On Access, Nothing Is Copied.
+    """
+
+    def __init__(self, chart: GantChart):
+        self.chart = chart
+        self._step = 1 if chart.marker is None else 2  # entries per run
+
+    def __len__(self):
+        runs = len(self.chart)
+        return runs * self._step + (1 if runs and self._step == 1 else 0)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("gant chart index out of range")
+        if index == size - 1:
+            return self.chart.end, "END"
+        run, part = divmod(index, self._step)
+        if part:
+            return self.chart.ends[run], self.chart.marker
+        return self.chart.starts[run], self.chart.name(run)
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        chart = self.chart
+        last = len(chart) - 1
+        for run in range(len(chart)):
+            yield chart.starts[run], chart.name(run)
+            if chart.marker is not None and run < last:
+                yield chart.ends[run], chart.marker
+        if last >= 0:
+            yield chart.end, "END"
+
+
+class ScheduleMother:
+    """
+        Mother Class Of Process Schedulers.
+        Each Scheduling Method Should Be Defined By Creating A Subclass Of This Class,
+        That Returns Its Policy From '_ready_queue', The Simulation Itself Is Shared:
+        Arrivals Are Merged In Order Of Enter Time, The Clock Jumps From Event To Event
+        (Arrival, Quantum Expiry Or Exit) And Every Event Costs One Policy Push/Pop.
+    """
+    name = ""  # name of scheduler
+    _slice_marker: Optional[str] = None  # gant entry at the end of each run of a process, like 'QUANT'
+    _change_time = 0  # context switch time after each run of a process
 
     def __init__(self):
-        self.processes: List[Process] = []
-        self.gant_chart = []
+        self.table = ProcessTable()  # the simulation reads and writes this table only
+        self._owned = True  # False while 'table' is one given to add_table, the caller still holds it
+        self.gant_chart = GantChart(self.table, self._slice_marker)
+        self._objects: List[Tuple[int, Process]] = []  # (row, process) added by add_process, get the results too
+        self._is_calc = False  # Whether a simulation has been done or not
+
+    def add_process(self, process: Process):
+        self._objects.append((len(self.table), process))
+        self._growable_table().append(process.name, process.enter, process.calc)
+        self._is_calc = False
+
+    def add_table(self, table: ProcessTable):
+        """
+            Adds Every Row Of A Table. If Nothing Was Added Before, The Table Itself Is Used
+            Without Copying And The Results Are Written Into Its 'response' And 'waiting' Columns.
+            Adding More Rows Later Copies It First, The Caller's Table Never Grows.
+        """
+        if len(self.table):
+            self._growable_table().extend(table)
+        else:
+            self.table = table
+            self._owned = False
         self._is_calc = False
 
-    def get_gant(self):
+    def _growable_table(self) -> ProcessTable:
+        # rows are never added to the caller's table (which may also be a mapped trace), but to a copy of it
+        if not self._owned:
+            self.table = self.table.copy()
+            self._owned = True
+        return self.table
+
+    def get_output(self) -> Union[List[Process], ProcessTable]:
+        """
+            Returns A List Of Processes That 'response' And 'waiting' Attributes Are Set,
+            The Added Process Objects Themselves, Or The ProcessTable If A Table Was Added.
+        """
         if not self._is_calc:
             self._calc()
-        return self.gant_chart
+        if len(self._objects) == len(self.table):
+            return [process for _, process in self._objects]
+        return self.table
 
-    def add_process(self, process: Process):
-        self.processes.append(process)
-        self._is_calc = False
+    def parameters(self) -> Dict[str, int]:
+        """
+            Parameters Of The Scheduler That Change Its Results, Schedulers With Equal Name
+            And Parameters Give The Same Results On The Same Workload.
+        """
+        return {}
 
-    def get_output(self):
+    def get_gant(self) -> Sequence[Tuple[int, str]]:
+        """
+            Returns A Read-Only Sequence Of Tuples Of An Integer And An String,
+            Integer Is The Starting Time Of A Process
+            String Is The Name Of That Process.
+            It's A View Of get_chart(), Tuples Are Made When Read.
+        """
+        return self.get_chart().legacy()
+
+    def get_chart(self) -> GantChart:
+        """
+            Returns The Gant Chart As Runs (See GantChart), Without Copying It.
+        """
         if not self._is_calc:
             self._calc()
-        return self.processes.copy()
+        return self.gant_chart
 
-    def _calc(self):
-        self.gant_chart.clear()
+    def run_online(self, processes: Iterable[Process]) -> Iterator[Tuple[str, tuple]]:
+        """
+            Online Mode: Simulates Processes While They Are Read From An Iterator, Which May Never End.
+            Processes Must Come In Order Of Enter Time. Yields (GANT, (time, name)) As Soon As A Process
+            Is Dispatched And (EXIT, (process, response, waiting)) As Soon As It Finishes, With Its
+            'response' And 'waiting' Set. Nothing Is Kept Except The Ready Queue, And The Scheduler's
+            Own Processes And Gant Chart Are Not Touched.
+            To Decide An Event, At Most One Process Past It Is Read From The Iterator.
+        """
+        def arrivals() -> Iterator[Tuple[Process, int, int]]:
+            last_enter = None
+            for process in processes:
+                if last_enter is not None and process.enter < last_enter:
+                    raise ValueError(f"Process {process.name} entered at {process.enter}, before {last_enter}")
+                last_enter = process.enter
+                yield process, process.enter, process.calc
+
+        for kind, data in self._simulate(arrivals(), lambda process: process.name):
+            if kind is EXIT:
+                process, process.response, process.waiting = data
+            yield kind, data
+
+    def _ready_queue(self) -> ReadyQueue:
+        """
+            Returns A New, Empty Policy For One Simulation.
+        """
+        raise NotImplementedError
+
+    def iter_events(self, chart: Optional[GantChart] = None) -> Iterator[Tuple[str, tuple]]:
+        """
+            Simulates The Added Processes And Yields Their Events (See _simulate) Without Storing
+            The Gant Chart, So A Caller Can Stop Early. 'response' And 'waiting' Still Go To The Table,
+            And Runs Go To 'chart' If One Is Given.
+        """
+        return self._table_events(self.table.name, chart)
+
+    def _table_events(self, name_of: Callable, chart: Optional[GantChart]) -> Iterator[Tuple[str, tuple]]:
+        table = self.table
+        enter, calc, response, waiting = table.enter, table.calc, table.response, table.waiting
+        arrivals = ((row, enter[row], calc[row]) for row in table.arrival_order())
+        for kind, data in self._simulate(arrivals, name_of, chart):
+            if kind is EXIT:
+                row, response[row], waiting[row] = data
+            yield kind, data
+
+    def steps(self) -> Iterator[int]:
+        """
+            Simulates The Added Processes Like get_output Does, Yielding The Simulated Time After Each Event,
+            So A Caller Can Show Progress Or Stop. If It Is Stopped, get_output And get_gant Give The Partial
+            Results: Processes That Did Not Finish Have No 'response' And 'waiting' Yet.
+        """
+        self.gant_chart = GantChart(self.table, self._slice_marker)
         self._is_calc = True
-        quant = 5
         time = 0
-        queue_all = sorted(self.processes, key=lambda e: e.enter)
-        queue1: List[Tuple[int ,Process]] = []  # first priority - FCFS
-        queue2: List[Tuple[int, Process]] = []  # second priority - FCFS
-        queue3: List[Tuple[int, Process]] = []  # last priority - RR
-        while any((queue1, queue2, queue3, queue_all)):
-            while queue_all and time >= queue_all[0].enter:
-                element = queue_all.pop(0)
-                queue1.append((element.calc, element))
-            if queue1:
-                time_left, element = queue1.pop(0)
-                self.gant_chart.append((time, element.name))
-                if time_left > quant:
-                    time += quant
-                    queue2.append((time_left-quant, element))
-                else:
-                    time += time_left
-                    element.response = time - element.enter  # exit time - enter time
-                    element.waiting = time - element.calc - element.enter  # exit - calculate time - enter
-            elif queue2:
-                time_left, element = queue2.pop(0)
-                self.gant_chart.append((time, element.name))
-                if time_left > quant:
-                    time += quant
-                    queue3.append((time_left - quant, element))
-                else:
-                    time += time_left
-                    element.response = time - element.enter  # exit time - enter time
-                    element.waiting = time - element.calc - element.enter  # exit - calculate time - enter
-            elif queue3:
-                time_left, element = queue3.pop(0)
-                self.gant_chart.append((time, element.name))
-                if time_left > quant:
-                    time += quant
-                    queue3.append((time_left - quant, element))
-                else:
-                    time += time_left
-                    element.response = time - element.enter  # exit time - enter time
-                    element.waiting = time - element.calc - element.enter  # exit - calculate time - enter
+        try:
+            for kind, data in self._table_events(int, self.gant_chart):
+                if kind is GANT:
+                    time = data[0]
+                yield time
+        finally:
+            self._copy_results()
+
+    def _calc(self):
+        self.gant_chart = GantChart(self.table, self._slice_marker)
+        self._is_calc = True
+        for _ in self._table_events(int, self.gant_chart):  # names come from the chart, not the events
+            pass
+        self._copy_results()
+
+    def _copy_results(self):
+        table = self.table
+        for row, process in self._objects:
+            row = table[row]  # a view, gives None for results not set yet
+            process.response = row.response
+            process.waiting = row.waiting
+
+    def _simulate(self, arrivals: Iterator[tuple], name_of: Callable,
+                  chart: Optional[GantChart] = None) -> Iterator[Tuple[str, tuple]]:
+        """
+            The Simulation Kernel, Yields GANT And EXIT Events In Order.
+            :param arrivals: (ref, enter, calc) of every process in order of enter time, ref is given back in EXIT
+            :param name_of: returns the name of a process from its ref
+            :param chart: gets every run of a process, refs must be rows of its table
+        """
+        upcoming = next(arrivals, None)  # next arrival, not admitted yet
+        if upcoming is None:
+            return
+        ready = self._ready_queue()
+        sequence = 0  # number of pushes so far
+        time = upcoming[1]  # time starts when first process entered
+        last: Optional[Job] = None  # last job that ran
+        interrupted = False  # whether last job was stopped by an arrival, not by its quantum
+        marker: Optional[int] = None  # end of last run, its marker waits until we know it's not the last one
+        while upcoming is not None or ready:
+            while upcoming is not None and upcoming[1] <= time:
+                ready.push(Job(*upcoming, sequence))
+                sequence += 1
+                upcoming = next(arrivals, None)
+            if not ready:  # cpu is idle until next process enters
+                time = upcoming[1]
+                continue
+            job = ready.pop(time)
+            if marker is not None:
+                yield GANT, (marker, self._slice_marker)
+            if job is not last or not interrupted:  # an arrival that didn't win is not a new gant entry
+                yield GANT, (time, name_of(job.ref))
+            last = job
+            run = job.remaining
+            quant = ready.quantum(job)
+            if quant is not None and quant < run:
+                run = quant
+            interrupted = ready.preemptive and upcoming is not None and upcoming[1] < time + run
+            if interrupted:
+                run = upcoming[1] - time
+            if chart is not None:
+                chart.add(time, time + run, job.ref)
+            time += run
+            job.remaining -= run
+            if job.remaining:
+                job.sequence = sequence
+                sequence += 1
+                # processes that entered during the run (or as it ended) have waited longer, they queue first,
+                # keyed queues are not affected, the job's sequence was taken before theirs
+                while upcoming is not None and upcoming[1] <= time:
+                    ready.push(Job(*upcoming, sequence))
+                    sequence += 1
+                    upcoming = next(arrivals, None)
+                ready.requeue(job)
             else:
-                time += 1  # if no element was available at queues
-        self.gant_chart.append((time, "END"))
+                # exit time - enter time, exit - calculate time - enter
+                yield EXIT, (job.ref, time - job.enter, time - job.calc - job.enter)
+            if self._slice_marker is not None:
+                marker = time
+            time += self._change_time  # context switch
+        # no context switch after the last process
+        yield GANT, (time - self._change_time, "END")
+
+
+class ScheduleFCFS(ScheduleMother):
+    name = "FCFS"  # name of scheduler
+
+    def _ready_queue(self) -> ReadyQueue:
+        return FIFOQueue()
+
+
+class ScheduleRR(ScheduleMother):
+    name = 'RR'
+    _slice_marker = 'QUANT'
+
+    def __init__(self, quant: int = 10, change_time: int = 2):
+        super(ScheduleRR, self).__init__()
+        self._quant = quant
+        self._change_time = change_time
+
+    def parameters(self) -> Dict[str, int]:
+        return {"quant": self._quant, "change_time": self._change_time}
+
+    def _ready_queue(self) -> ReadyQueue:
+        return FIFOQueue(self._quant)
+
+
+class ScheduleSPN(ScheduleMother):
+    name = "SPN/SJF"
+
+    def _ready_queue(self) -> ReadyQueue:
+        return BurstHeap()
+
+
+class ScheduleSRT(ScheduleMother):
+    name = "SRT"
+
+    def _ready_queue(self) -> ReadyQueue:
+        return RemainingTimeHeap()
+
+
+class ScheduleHRRN(ScheduleMother):
+    name = "HRRN"
+
+    def _ready_queue(self) -> ReadyQueue:
+        return ResponseRatioIndex()  # ratios are compared at dispatch time
+
+
+class ScheduleFB(ScheduleMother):
+    name = "FB"
+
+    def _ready_queue(self) -> ReadyQueue:
+        # first and second priority - FCFS, last priority - RR
+        return FeedbackQueues(levels=3, quant=5)
 
 
 class ScheduleLCFS(ScheduleMother):
     name = "LCFS"  # name of scheduler
 
-    def __init__(self):
-        self.processes = []
-        self.gant_output = []
-        self.calc = False  # Whether a simulation has been done or not
+    def _ready_queue(self) -> ReadyQueue:
+        return LIFOQueue()
 
-    def add_process(self, process: Process):
-        self.processes.append(process)
-        self.calc = False
 
-    def _calc(self):
-        self.gant_output.clear()
-        # we need a simple queue to add processes into it in order of getting in
-        waiting_queue: List[Process] = sorted(self.processes, key=lambda e: e.enter)
-        # queue.pop(0) will return first element in queue,
-        queue: List[Process] = []
-        time = waiting_queue[0].enter  # time starts when first process entered
-        while queue or waiting_queue:  # until there is process
-            while waiting_queue and waiting_queue[0].enter <= time:
-                queue.append(waiting_queue.pop(0))
-            process = queue.pop()
-            self.gant_output.append((time, process.name))
-            time += process.calc
-            process.response = time - process.enter  # exit time - enter time
-            process.waiting = time - process.calc - process.enter  # exit - calculate time - enter
-        self.gant_output.append((time, 'END'))
-        self.calc = True
-
-    def get_output(self) -> List[Process]:
-        if not self.calc:
-            self._calc()
-        return self.processes.copy()
+def fcfs_batch(enter, calc):
+    """
+        Vectorized FCFS For Whole Arrays Of Processes, Same Results As ScheduleFCFS Without Process Objects.
+        A Process Exits At max(its enter, previous exit) + calc, Which Unrolls To
+        exit[i] = C[i] + max(enter[j] - C[j-1] for j <= i), C Being The Cumulative Sum Of calc.
+        :param enter: enter times, any integer array-like
+        :param calc: calculate times, same length as enter
+        :return: (order, start, response, waiting) as numpy arrays,
+                 order and start are in running order (gant chart: start[k] is when process order[k] starts),
+                 response and waiting are aligned with the input arrays
+    """
+    try:
+        import numpy  # optional, and only needed here, importing it with the module slows down every start
+    except ImportError:
+        raise ImportError("fcfs_batch needs numpy") from None
+    enter = numpy.asarray(enter, dtype=numpy.int64)
+    calc = numpy.asarray(calc, dtype=numpy.int64)
+    order = numpy.argsort(enter, kind="stable")  # same tie break as sorted() in ScheduleMother
+    sorted_enter = enter[order]
+    sorted_calc = calc[order]
+    total = numpy.cumsum(sorted_calc)
+    exit_time = total + numpy.maximum.accumulate(sorted_enter - (total - sorted_calc))
+    start = exit_time - sorted_calc
+    response = numpy.empty_like(enter)
+    waiting = numpy.empty_like(enter)
+    response[order] = exit_time - sorted_enter  # exit time - enter time
+    waiting[order] = start - sorted_enter  # exit - calculate time - enter
+    return order, start, response, waiting
+
+
+class TraceReader:
+    """
+        Streaming Reader Of Trace Files, One "name enter calc" Process Per Line.
+        The File Is Read In Chunks Of 'chunk_size' Bytes (Through mmap If 'use_mmap'),
+        So Only One Chunk Of Raw Text Is In Memory At A Time.
+        Blank Lines And Lines Starting With '#' Are Counted In 'skipped',
+        Malformed Lines Are Counted In 'rejected' And The First Few Are Kept In 'errors'.
+        Setting 'cancel' Stops The Reading At The Next Chunk, 'progress' Is Called With The Size Of Every Chunk Read.
+    """
+    MAX_ERRORS = 10  # number of rejected lines kept in 'errors'
+
+    def __init__(self, filename: str, chunk_size: int = 1 << 20, use_mmap: bool = False,
+                 cancel: Optional[threading.Event] = None, progress: Optional[Callable[[int], None]] = None):
+        if not os.path.exists(filename):
+            raise FileNotFoundError(f"File Not Found: {filename}")
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.use_mmap = use_mmap
+        self.cancel = cancel
+        self.progress = progress
+        self.lines = 0  # lines read so far
+        self.skipped = 0
+        self.rejected = 0
+        self.errors: List[Tuple[int, str]] = []  # (line number, line) of the first rejected lines
+
+    def _chunks(self) -> Iterator[bytes]:
+        for chunk in self._read_chunks():
+            if self.cancel is not None and self.cancel.is_set():
+                return  # the rows read so far are kept
+            if self.progress is not None:
+                self.progress(len(chunk))
+            yield chunk
+
+    def _read_chunks(self) -> Iterator[bytes]:
+        with open(self.filename, 'rb') as file:
+            if self.use_mmap:
+                if os.fstat(file.fileno()).st_size == 0:
+                    return  # an empty file can't be mapped
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as memory:
+                    for start in range(0, len(memory), self.chunk_size):
+                        yield memory[start:start + self.chunk_size]
+            else:
+                chunk = file.read(self.chunk_size)
+                while chunk:
+                    yield chunk
+                    chunk = file.read(self.chunk_size)
+
+    def _lines(self) -> Iterator[bytes]:
+        rest = b""  # a line cut by the end of a chunk
+        for chunk in self._chunks():
+            lines = (rest + chunk).split(b"\n")
+            rest = lines.pop()
+            yield from lines
+        if rest:
+            yield rest
+
+    def rows(self) -> Iterator[Tuple[bytes, int, int]]:
+        """
+            Yields (utf-8 name, enter, calc) Of Every Valid Line.
+        """
+        self.lines = self.skipped = self.rejected = 0
+        self.errors.clear()
+        for line in self._lines():
+            self.lines += 1
+            parts = line.split()
+            if not parts or parts[0].startswith(b"#"):
+                self.skipped += 1
+                continue
+            try:
+                name, enter, calc = parts
+                enter, calc = int(enter), int(calc)
+                name.decode()
+                if calc < 0:
+                    raise ValueError("negative calculate time")
+            except ValueError:  # wrong number of fields, not an integer or not utf-8
+                self.rejected += 1
+                if len(self.errors) < self.MAX_ERRORS:
+                    self.errors.append((self.lines, line.decode(errors="replace").strip()))
+                continue
+            yield name, enter, calc
+
+    def processes(self) -> Iterator[Process]:
+        for name, enter, calc in self.rows():
+            yield Process(name.decode(), enter, calc)
+
+    def batches(self, size: int = 1 << 16) -> Iterator[ProcessTable]:
+        """
+            Yields ProcessTables Of At Most 'size' Rows Each.
+        """
+        table = ProcessTable()
+        for row in self.rows():
+            table.append(*row)
+            if len(table) == size:
+                yield table
+                table = ProcessTable()
+        if len(table):
+            yield table
+
+    def table(self) -> ProcessTable:
+        """
+            Reads The Whole File Into One ProcessTable.
+        """
+        table = ProcessTable()
+        for row in self.rows():
+            table.append(*row)
+        return table
 
-    def get_gant(self) -> List[Tuple[int, str]]:
-        if not self.calc:
-            self._calc()
-        return self.gant_output.copy()
+    def report(self) -> str:
+        res = f"{self.lines} lines, {self.skipped} skipped, {self.rejected} rejected"
+        for number, line in self.errors:
+            res += f"\nline {number}: {line!r}"
+        return res
 
 
-def read_from_file(filename: str):
-    if not os.path.exists(filename):
-        raise FileNotFoundError(f"File Not Found: {filename}")
-    res = []
-    with open(filename, 'r') as file:
-        for line in file:
-            name, enter, calc = line.split()
-            res.append(Process(name, int(enter), int(calc)))
-    return res
+def read_from_file(filename: str) -> List[Process]:
+    """
+        Reads A Whole Trace Into Process Objects, Malformed Lines Are Left Out, Read With A TraceReader To Report Them.
+    """
+    return list(TraceReader(filename).processes())
 
 
-def write_to_file(filename: str, objects: List, *attributes):
+def read_table(filename: str) -> ProcessTable:
+    """
+        Same As read_from_file, But Into A ProcessTable, Without A Python Object Per Process.
+        Binary Traces (See convert_trace) Are Memory-Mapped Instead Of Parsed.
+    """
+    if is_binary_trace(filename):
+        return load_binary_trace(filename)
+    return TraceReader(filename).table()
+
+
+# Binary trace format, all numbers in the byte order of the machine that wrote it:
+#   header: magic, version, flags, rows, names, bytes of names (_TRACE_HEADER)
+#   name ends: u64 per name      enter: i64 per row      calc: i64 per row
+#   order: u64 per row, rows by enter time (only if flags & _HAS_ORDER, i.e. rows are not sorted)
+#   name ids: u32 per row, padded to 8 bytes (only if flags & _HAS_NAME_IDS, i.e. names repeat)
+#   names: utf-8 bytes of every distinct name, one after another
+TRACE_MAGIC = b"OS4001TR"
+_TRACE_VERSION = 1
+_TRACE_HEADER = struct.Struct("<8sIIQQQ")
+_HAS_NAME_IDS = 1
+_HAS_ORDER = 2
+_BIG_ENDIAN = 4
+
+
+def _write_binary_trace(filename: str, names, name_ends, enter, calc, name_ids=None):
+    rows = len(enter)
+    order = None
+    if any(enter[i] > enter[i + 1] for i in range(rows - 1)):
+        order = array('Q', sorted(range(rows), key=enter.__getitem__))
+    flags = (_HAS_NAME_IDS if name_ids is not None else 0) | (_HAS_ORDER if order is not None else 0)
+    if sys.byteorder == "big":
+        flags |= _BIG_ENDIAN
+    with open(filename, "wb") as file:
+        file.write(_TRACE_HEADER.pack(TRACE_MAGIC, _TRACE_VERSION, flags, rows, len(name_ends), len(names)))
+        for column in (name_ends, enter, calc, order, name_ids):
+            if column is not None:
+                file.write(column)  # arrays and memoryviews are written as raw buffers
+        if name_ids is not None and rows % 2:
+            file.write(bytes(4))
+        file.write(names)
+
+
+def save_binary_trace(table: ProcessTable, filename: str):
+    """
+        Writes A ProcessTable In The Binary Trace Format.
+    """
+    _write_binary_trace(filename, table._names, table._name_ends, table.enter, table.calc, table._name_ids)
+
+
+def convert_trace(source: str, target: str, **reader_options) -> TraceReader:
+    """
+        Converts A Text Trace To The Binary Format, Names That Repeat Are Stored Once.
+        :param reader_options: passed to TraceReader
+        :return: the reader, for its skipped / rejected counts
+    """
+    reader = TraceReader(source, **reader_options)
+    ids: Dict[bytes, int] = {}
+    names = bytearray()
+    name_ends = array('Q')
+    name_ids = array('I')
+    enter = array('q')
+    calc = array('q')
+    for name, enter_time, calc_time in reader.rows():
+        index = ids.get(name)
+        if index is None:
+            index = ids[name] = len(name_ends)
+            names += name
+            name_ends.append(len(names))
+        name_ids.append(index)
+        enter.append(enter_time)
+        calc.append(calc_time)
+    del ids
+    if len(name_ends) == len(enter):  # every name is distinct, row i has name i
+        name_ids = None
+    _write_binary_trace(target, names, name_ends, enter, calc, name_ids)
+    return reader
+
+
+def is_binary_trace(filename: str) -> bool:
+    with open(filename, "rb") as file:
+        return file.read(len(TRACE_MAGIC)) == TRACE_MAGIC
+
+
+def load_binary_trace(filename: str) -> ProcessTable:
+    """
+        Memory-Maps A Binary Trace, The Table Columns Are Views On The File, Nothing Is Copied Or Parsed.
+        Only 'response' And 'waiting' Are Allocated.
+    """
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f"File Not Found: {filename}")
+    with open(filename, "rb") as file:
+        memory = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)  # stays open after the file is closed
+    if len(memory) < _TRACE_HEADER.size:
+        raise ValueError(f"Not A Binary Trace: {filename}")
+    magic, version, flags, rows, names, name_bytes = _TRACE_HEADER.unpack_from(memory)
+    if magic != TRACE_MAGIC or version != _TRACE_VERSION:
+        raise ValueError(f"Not A Binary Trace (version {_TRACE_VERSION}): {filename}")
+    if bool(flags & _BIG_ENDIAN) != (sys.byteorder == "big"):
+        raise ValueError(f"Binary Trace Was Written With Another Byte Order: {filename}")
+    ids_size = 4 * (rows + rows % 2) if flags & _HAS_NAME_IDS else 0
+    size = _TRACE_HEADER.size + 8 * names + 16 * rows + (8 * rows if flags & _HAS_ORDER else 0) + ids_size + name_bytes
+    if len(memory) != size:
+        raise ValueError(f"Binary Trace Is Truncated Or Corrupted: {filename}")
+    view = memoryview(memory)
+    offset = _TRACE_HEADER.size
+
+    def take(count: int, typecode: str, itemsize: int) -> memoryview:
+        nonlocal offset
+        column = view[offset:offset + count * itemsize].cast(typecode)
+        offset += count * itemsize
+        return column
+
+    name_ends = take(names, 'Q', 8)
+    enter = take(rows, 'q', 8)
+    calc = take(rows, 'q', 8)
+    order = take(rows, 'Q', 8) if flags & _HAS_ORDER else range(rows)
+    name_ids = None
+    if flags & _HAS_NAME_IDS:
+        name_ids = take(rows, 'I', 4)
+        offset += 4 * (rows % 2)
+    return ProcessTable.from_columns(view[offset:offset + name_bytes], name_ends, enter, calc, name_ids, order)
+
+
+def write_to_file(filename: str, objects: Union[List, ProcessTable], *attributes):
     with open(filename, "w") as file:
-        for obj in objects:
-            lst = []
-            for attr in attributes:
-                lst.append(getattr(obj, attr))
+        if isinstance(objects, ProcessTable):  # straight from the columns, no views
+            rows = zip(*(objects.column(attr) for attr in attributes))
+        else:
+            rows = ([getattr(obj, attr) for attr in attributes] for obj in objects)
+        for lst in rows:
             file.write(" ".join(str(i) for i in lst))
             file.write("\n")
@@ -0,0 +1,114 @@
+# sweep.py - tune ScheduleRR's quantum and context switch time on a workload
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from typing import List, Dict, Optional, Sequence, Tuple, Union
+from model import ScheduleRR, ProcessTable, load_binary_trace, GANT
+from compare import shared_trace, pool_context
+
+QUANTS = (1, 2, 5, 10, 20, 50, 100)
+CHANGE_TIMES = (0, 1, 2, 5)
+CHECK_EVERY = 1024  # events between two checks against the known front
+
+
+def _dominated(mean_wait: float, overhead: int, front: Sequence[Tuple[float, int]]) -> bool:
+    return any(wait <= mean_wait and cost <= overhead for wait, cost in front)
+
+
+def _evaluate(trace: str, quant: int, change_time: int, front: List[Tuple[float, int]]) -> Dict:
+    """
+        Runs One Configuration In A Worker. Waiting Time And Overhead Only Grow During A Simulation,
+        So Once Their Partial Values Are Dominated By A Finished Configuration, The Final Ones Are Too,
+        And The Simulation Is Stopped There.
+    """
+    scheduler = ScheduleRR(quant, change_time)
+    scheduler.add_table(load_binary_trace(trace))
+    count = len(scheduler.table)
+    res = {"quant": quant, "change_time": change_time, "pruned": False}
+    total_wait = 0
+    runs = 0  # runs of a process, a context switch happens between two runs
+    for events, (kind, data) in enumerate(scheduler.iter_events()):
+        if kind is GANT:
+            if data[1] not in ("QUANT", "END"):
+                runs += 1
+        else:
+            total_wait += data[2]
+        if front and events % CHECK_EVERY == 0 and _dominated(total_wait / count, max(runs - 1, 0) * change_time,
+                                                                front):
+            res["pruned"] = True
+            break
+    res["mean_wait"] = total_wait / count if count else 0
+    res["overhead"] = max(runs - 1, 0) * change_time
+    return res
+
+
+def pareto_front(results: List[Dict]) -> List[Dict]:
+    """
+        Finished Results That No Other One With The Same Change Time Beats On Both Mean Waiting Time
+        And Overhead, By Change Time Then Overhead. Of Equal Results Only The First Is Kept.
+        The Change Time Is A Cost Of The Machine, Not A Choice, So Each One Has Its Own Front.
+    """
+    front = []
+    for res in sorted(results, key=lambda r: (r["change_time"], r["overhead"], r["mean_wait"])):
+        if res["pruned"]:
+            continue
+        if not front or front[-1]["change_time"] != res["change_time"] or res["mean_wait"] < front[-1]["mean_wait"]:
+            front.append(res)
+    return front
+
+
+def _refine(quants: Sequence[int], front: List[Dict]) -> List[int]:
+    """
+        New Quantums Halfway Between Each Front Member's Quantum And Its Evaluated Neighbours.
+    """
+    quants = sorted(set(quants))
+    new = set()
+    for res in front:
+        if res["change_time"] == 0:  # no overhead, the front is only the lowest waiting time
+            continue
+        index = quants.index(res["quant"])
+        for neighbour in quants[max(index - 1, 0):index + 2]:
+            middle = (neighbour + res["quant"]) // 2
+            if middle not in quants and middle > 0:
+                new.add(middle)
+    return sorted(new)
+
+
+def sweep_rr(workload: Union[str, ProcessTable], quants: Sequence[int] = QUANTS,
+             change_times: Sequence[int] = CHANGE_TIMES, workers: Optional[int] = None,
+             rounds: int = 0) -> Tuple[List[Dict], List[Dict]]:
+    """
+        Evaluates ScheduleRR On Every (quant, change_time) Pair Of The Grid On A Process Pool.
+        Configurations Run In Waves Of One Per Worker, Each Wave Knows The Front Of The Finished Ones
+        With The Same Change Time And Stops Simulations That Became Dominated. With 'rounds', The Search Then Adds Quantums
+        Between The Front Members And Their Neighbours, Round After Round (Adaptive Search).
+        :return: (pareto fronts of mean waiting time against context switch overhead, one per change time,
+                  every result)
+    """
+    workers = workers or cpu_count() or 1
+    results: List[Dict] = []
+    configs = [(quant, change) for change in sorted(change_times) for quant in quants]
+    evaluated = list(quants)
+    with shared_trace(workload) as trace, ProcessPoolExecutor(workers, mp_context=pool_context()) as pool:
+        for round_number in range(rounds + 1):
+            for start in range(0, len(configs), workers):
+                front = pareto_front(results)
+                futures = [pool.submit(_evaluate, trace, quant, change,
+                                       [(res["mean_wait"], res["overhead"]) for res in front
+                                        if res["change_time"] == change])
+                           for quant, change in configs[start:start + workers]]
+                results.extend(future.result() for future in futures)
+            if round_number == rounds:
+                break
+            new = _refine(evaluated, pareto_front(results))
+            if not new:
+                break
+            evaluated.extend(new)
+            configs = [(quant, change) for change in sorted(change_times) for quant in new]
+    return pareto_front(results), results
+
+
+def format_front(front: List[Dict]) -> str:
+    lines = [f"{'Quantum':>8} {'Switch':>7} {'Wait mean':>10} {'Overhead':>10}"]
+    for res in front:
+        lines.append(f"{res['quant']:>8} {res['change_time']:>7} {res['mean_wait']:>10.2f} {res['overhead']:>10}")
+    return "\n".join(lines)
@@ -1,24 +1,247 @@
 # view.py - tkinter GUI
 import os.path
+from bisect import bisect_left, bisect_right
+from array import array
 from tkinter import Tk as _Tk, Label as _Label, Button as _Button, Frame as _Frame,\
-    LabelFrame as _LabelFrame, StringVar as _StringVar, Entry as _Entry, Canvas as _Canvas
+    LabelFrame as _LabelFrame, StringVar as _StringVar, Entry as _Entry, Canvas as _Canvas, Scrollbar as _Scrollbar
 from tkinter.ttk import Treeview as _Treeview, Combobox as _Combobox
-from typing import List, Callable, Tuple, Optional
-from model import Process
+from typing import List, Callable, Tuple, Optional, Sequence, Dict, Union
+from model import Process, ProcessTable, GantChart, LegacyGant
 from database import Database
+from worker import SimulationRun, READING, DONE
 
 FONT = ("Times New Roman", 16)
+COLORS = ("#9ecae1", "#fdae6b", "#a1d99b", "#bcbddc", "#fc9272", "#c7e9c0", "#fdd0a2", "#dadaeb")
+PAGE = 10  # rows of the process table on screen
+POLL_MS = 100  # how often a running simulation is checked
+TICK_STEPS = (1, 2, 5)  # times a power of 10, steps of the gant time axis
+
+
+class ProcessRows:
+    """
+        Rows Of The Process Table In The Order Shown. A Sort Order Is Computed Once Per Column
+        As An Array Of Row Indexes And Kept, Reversing Reads It Backwards, So Sorting Again Costs Nothing
+        And Getting The Row At Some Position Is One Lookup, Only The Rows On Screen Are Ever Read.
+    """
+    COLUMNS = ("name", "enter", "calc", "waiting", "response")
+
+    def __init__(self, processes: Union[List[Process], ProcessTable]):
+        self.processes = processes
+        self._orders: Dict[str, Sequence[int]] = {}
+        self.order: Sequence[int] = range(len(processes))
+        self.sort_by: Optional[str] = None
+        self.reverse = False
+
+    def __len__(self) -> int:
+        return len(self.processes)
+
+    def sort(self, column: str):
+        """
+            Sorts By A Column, Sorting Again By The Same Column Reverses The Order.
+        """
+        self.reverse = not self.reverse if column == self.sort_by else False
+        self.sort_by = column
+        if column not in self._orders:
+            if isinstance(self.processes, ProcessTable):
+                values = list(self.processes.column(column))
+            else:
+                values = [getattr(process, column) for process in self.processes]
+            self._orders[column] = array('I' if len(values) < 2 ** 32 else 'Q',
+                                         sorted(range(len(values)), key=values.__getitem__))
+        self.order = self._orders[column]
+
+    def row(self, position: int) -> Tuple:
+        index = self.order[len(self.order) - 1 - position if self.reverse else position]
+        process = self.processes[index]
+        return tuple(getattr(process, column) for column in self.COLUMNS)
+
+
+class GantView(_Frame):
+    """
+        Scrollable And Zoomable Gant Chart, Only The Visible Time Window Is Drawn.
+        Visible Runs Are Found By Binary Search On The Chart's Columns, When They Get Narrower
+        Than MIN_RUN Pixels, Each BUCKET Pixels Are Drawn As One Bar As High As The Cpu Was Busy In It,
+        So A Redraw Costs The Width Of The Canvas, Not The Length Of The Chart.
+        Mouse Wheel Zooms Around The Pointer, Dragging Or The Scrollbar Moves In Time.
+    """
+    MIN_RUN = 4  # pixels, narrower runs are aggregated
+    BUCKET = 3  # pixels per aggregated bar
+    HEIGHT = 40  # of the bars, the time axis is under them
+    MAX_SCALE = 200  # pixels per time unit when zoomed in the most
+
+    def __init__(self, master, width: int = 1000):
+        super(GantView, self).__init__(master, bg="white")
+        self.canvas = _Canvas(self, width=width, height=self.HEIGHT + 30, bg="white", highlightthickness=0)
+        self.canvas.grid(row=1, column=1, columnspan=4, sticky="we")
+        self.scrollbar = _Scrollbar(self, orient="horizontal", command=self.scroll)
+        self.scrollbar.grid(row=2, column=1, columnspan=4, sticky="we")
+        _Button(self, text="-", width=3, bg="white", command=lambda: self.zoom(1 / 2)).grid(row=3, column=1)
+        _Button(self, text="+", width=3, bg="white", command=lambda: self.zoom(2)).grid(row=3, column=2)
+        _Button(self, text="Fit", width=3, bg="white", command=self.fit).grid(row=3, column=3)
+        self.chart: Optional[GantChart] = None
+        self._busy = array('q')  # cpu time used before each run
+        self.offset = 0.0  # time at the left edge
+        self.scale = 1.0  # pixels per time unit
+        self._drag: Optional[Tuple[int, float]] = None  # (x, offset) where a drag started
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<MouseWheel>", lambda e: self.zoom(1.25 if e.delta > 0 else 0.8, e.x))
+        self.canvas.bind("<Button-4>", lambda e: self.zoom(1.25, e.x))  # wheel on x11
+        self.canvas.bind("<Button-5>", lambda e: self.zoom(0.8, e.x))
+        self.canvas.bind("<ButtonPress-1>", self._drag_start)
+        self.canvas.bind("<B1-Motion>", self._drag_move)
+
+    def show(self, gant: Sequence[Tuple[int, str]]):
+        """
+            Shows A Gant Chart, A View From get_gant() Or A List Of (Time, Name) Tuples, Zoomed To Fit.
+        """
+        self.chart = gant.chart if isinstance(gant, LegacyGant) else GantChart.from_legacy(gant)
+        busy = array('q', [0]) * len(self.chart)
+        total = 0
+        for index, (start, end) in enumerate(zip(self.chart.starts, self.chart.ends)):
+            busy[index] = total
+            total += end - start
+        self._busy = busy
+        self.fit()
+
+    def _width(self) -> int:
+        width = self.canvas.winfo_width()
+        return width if width > 1 else int(self.canvas["width"])  # not mapped yet
+
+    def _span(self) -> Tuple[int, int]:
+        if self.chart is None or not len(self.chart):
+            return 0, 1
+        return self.chart.starts[0], max(self.chart.end, self.chart.starts[0] + 1)
+
+    def fit(self):
+        first, last = self._span()
+        self.scale = self._width() / (last - first)
+        self.offset = first
+        self.redraw()
+
+    def zoom(self, factor: float, x: Optional[int] = None):
+        """
+            Multiplies The Scale By 'factor', The Time Under 'x' (The Middle By Default) Stays In Place.
+        """
+        if x is None:
+            x = self._width() // 2
+        first, last = self._span()
+        time = self.offset + x / self.scale
+        self.scale = min(max(self.scale * factor, self._width() / (last - first)), self.MAX_SCALE)
+        self.offset = time - x / self.scale
+        self.redraw()
+
+    def scroll(self, *args):
+        """
+            Scrollbar Command: ('moveto', fraction) Or ('scroll', number, 'units' Or 'pages').
+        """
+        first, last = self._span()
+        window = self._width() / self.scale
+        if args[0] == "moveto":
+            self.offset = first + float(args[1]) * (last - first)
+        elif args[0] == "scroll":
+            self.offset += int(args[1]) * window * (0.9 if args[2] == "pages" else 0.1)
+        self.redraw()
+
+    def _drag_start(self, event):
+        self._drag = event.x, self.offset
+
+    def _drag_move(self, event):
+        if self._drag is not None:
+            self.offset = self._drag[1] - (event.x - self._drag[0]) / self.scale
+            self.redraw()
+
+    def busy_until(self, time: float) -> float:
+        """
+            Cpu Time Used By All Runs Before 'time'.
+        """
+        chart = self.chart
+        index = bisect_right(chart.starts, time) - 1
+        if index < 0:
+            return 0
+        return self._busy[index] + min(time, chart.ends[index]) - chart.starts[index]
+
+    def visible(self, width: int) -> range:
+        """
+            Indexes Of The Runs In The Time Window Of The Canvas.
+        """
+        end = self.offset + width / self.scale
+        return range(bisect_right(self.chart.ends, self.offset), bisect_left(self.chart.starts, end))
+
+    def redraw(self):
+        canvas = self.canvas
+        canvas.delete("all")
+        width = self._width()
+        first, last = self._span()
+        window = width / self.scale
+        self.offset = max(first, min(self.offset, last - window))
+        self.scrollbar.set((self.offset - first) / (last - first), (self.offset + window - first) / (last - first))
+        if self.chart is None or not len(self.chart):
+            return
+        runs = self.visible(width)
+        if len(runs) * self.MIN_RUN > width:
+            self._draw_buckets(width)
+        else:
+            self._draw_runs(runs, width)
+        self._draw_axis(width)
+
+    def _draw_runs(self, runs: range, width: int):
+        chart, canvas = self.chart, self.canvas
+        for index in runs:
+            x0 = max((chart.starts[index] - self.offset) * self.scale, 0)
+            x1 = min((chart.ends[index] - self.offset) * self.scale, width - 1)
+            canvas.create_rectangle(x0, 2, x1, self.HEIGHT, fill=COLORS[chart.ids[index] % len(COLORS)])
+            name = chart.name(index)
+            if x1 - x0 > 8 * len(name) + 4:  # only names that fit
+                canvas.create_text((x0 + x1) / 2, self.HEIGHT / 2 + 1, text=name)
+
+    def _draw_buckets(self, width: int):
+        step = self.BUCKET / self.scale
+        time = self.offset
+        before = self.busy_until(time)
+        for x in range(0, width, self.BUCKET):
+            after = self.busy_until(time + step)
+            if after > before:
+                height = (self.HEIGHT - 2) * min((after - before) / step, 1)
+                self.canvas.create_rectangle(x, self.HEIGHT - height, x + self.BUCKET, self.HEIGHT,
+                                             fill="#6baed6", width=0)
+            time += step
+            before = after
+        self.canvas.create_rectangle(0, 2, width - 1, self.HEIGHT)
+
+    @staticmethod
+    def tick_step(scale: float) -> int:
+        """
+            Time Between Axis Ticks: 1, 2 Or 5 Times A Power Of 10, The First One At Least 80 Pixels Wide.
+        """
+        index, power = 0, 1
+        while TICK_STEPS[index] * power * scale < 80:
+            index += 1
+            if index == len(TICK_STEPS):
+                index, power = 0, power * 10
+        return TICK_STEPS[index] * power
+
+    def _draw_axis(self, width: int):
+        step = self.tick_step(self.scale)
+        tick = int(self.offset // step) * step
+        while tick <= self.offset + width / self.scale:
+            x = (tick - self.offset) * self.scale
+            if x >= 0:
+                self.canvas.create_line(x, self.HEIGHT, x, self.HEIGHT + 6)
+                self.canvas.create_text(x, self.HEIGHT + 8, text=str(tick), anchor="n")
+            tick += step
 
 
 class Panel(_Tk):
-    def __init__(self, schedule_callback: Callable[[str, str], Tuple[List[Process], List[Tuple[int, str]]]],
-                 schedulers: List[str]):
+    def __init__(self, schedule_callback: Callable[[str, str], SimulationRun], schedulers: List[str]):
         super(Panel, self).__init__()
         self.schedule_callback = schedule_callback
         self.title("OS4001 Project - Mahjoor & Eslami")
         self.geometry("1100x600")
         self.config(bg="white")
-        self.processes: Optional[List[Process]] = None
+        self.processes: Optional[Union[List[Process], ProcessTable]] = None
+        self.rows: Optional[ProcessRows] = None
+        self.first_row = 0  # position of the top row on screen
+        self.run: Optional[SimulationRun] = None  # the simulation being loaded
         mother = _Frame(self, bd=1, relief="solid", bg="white")
         mother.grid(row=1, column=1, padx=5, pady=5)
         up = _Frame(mother, bg="white")
@@ -32,8 +255,13 @@ class Panel(_Tk):
         ent_filename = _Entry(inp, textvariable=self.string_var_input_filename, font=FONT)
         ent_filename.grid(row=1, column=2, pady=5, padx=5)
         ent_filename.bind("<KeyRelease>", self.validate_filename)  # Change Field Color Whether File Exists
-        _Button(inp, text="Load", font=FONT, bg="white", command=self.load_inp).grid(row=2, column=2, pady=5,
-                                                                                     padx=5, sticky="e")
+        self.load_button = _Button(inp, text="Load", font=FONT, bg="white", command=self.load_inp)
+        self.load_button.grid(row=2, column=2, pady=5, padx=5, sticky="e")
+        self.cancel_button = _Button(inp, text="Cancel", font=FONT, bg="white", command=self.cancel_run,
+                                     state="disabled")
+        self.cancel_button.grid(row=3, column=2, pady=5, padx=5, sticky="e")
+        self.string_var_status = _StringVar(self, value="")
+        _Label(inp, textvariable=self.string_var_status, bg="white").grid(row=4, column=1, columnspan=2, sticky="w")
         _Label(inp, text="Scheduler:", font=FONT, bg="white").grid(row=2, column=1, pady=5)
         self.scheduler_combo = _Combobox(inp, font=FONT, state='readonly', values=schedulers, width=10)
         self.scheduler_combo.grid(row=2, column=2, padx=5, sticky='w')
@@ -41,8 +269,14 @@ class Panel(_Tk):
         tr = _LabelFrame(up, text="Processes", font=FONT, bg="white")
         tr.grid(row=1, column=1, padx=5, pady=5, sticky="w")
         self.tree = _Treeview(tr, columns=("Name", "Enter", "Calc", "Wait", "Response"),
-                              show="headings", selectmode="none")
-        self.tree.grid(row=2, column=1, padx=10, pady=10, sticky="w")
+                              show="headings", selectmode="none", height=PAGE)
+        self.tree.grid(row=2, column=1, padx=(10, 0), pady=10, sticky="w")
+        self.tree_scrollbar = _Scrollbar(tr, orient="vertical", command=self.scroll_rows)
+        self.tree_scrollbar.grid(row=2, column=2, padx=(0, 10), pady=10, sticky="ns")
+        # the tree only holds the rows on screen, scrolling fills them with other processes
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_rows("scroll", -1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.scroll_rows("scroll", -1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_rows("scroll", 1, "units"))
         tree = self.tree
         tree.heading('Name', text="Name", anchor="w", command=self.sort_name)
         tree.column("Name", width=100)
@@ -56,108 +290,131 @@ class Panel(_Tk):
         tree.column("Response", width=75)
         gant_frame = _LabelFrame(mother, text="Gant Chart", bg="white")
         gant_frame.grid(row=2, column=1, padx=5, pady=5)
-        self.canvas = _Canvas(gant_frame, width=1000, height=50, bg="white")
-        self.canvas.grid(row=1, column=1, padx=5, pady=5)
+        self.gant = GantView(gant_frame, width=1000)
+        self.gant.grid(row=1, column=1, padx=5, pady=5)
         _Button(mother, text="text-mode", command=self.exit_to_text,
                 bg="white", relief="solid", bd=1).grid(row=3, column=1, padx=5, sticky="e")
-        self.sort_by = None
 
     def sort_name(self):
-        reverse = True if self.sort_by == "name" else False
-        self.sort_by = "name"
-        if self.processes:
-            self.tree.delete(*self.tree.get_children(""))
-            for process in sorted(self.processes, key=lambda e: e.name, reverse=reverse):
-                self.tree.insert("", "end", values=(process.name, process.enter, process.calc,
-                                                    process.waiting, process.response))
+        self.sort_rows("name")
 
     def sort_enter(self):
-        reverse = True if self.sort_by == "enter" else False
-        self.sort_by = "enter"
-        if self.processes:
-            self.tree.delete(*self.tree.get_children(""))
-            for process in sorted(self.processes, key=lambda e: e.enter, reverse=reverse):
-                self.tree.insert("", "end", values=(process.name, process.enter, process.calc,
-                                                    process.waiting, process.response))
+        self.sort_rows("enter")
 
     def sort_calc(self):
-        reverse = True if self.sort_by == "calc" else False
-        self.sort_by = "calc"
-        if self.processes:
-            self.tree.delete(*self.tree.get_children(""))
-            for process in sorted(self.processes, key=lambda e: e.calc, reverse=reverse):
-                self.tree.insert("", "end", values=(process.name, process.enter, process.calc,
-                                                    process.waiting, process.response))
+        self.sort_rows("calc")
 
     def sort_wait(self):
-        reverse = True if self.sort_by == "wait" else False
-        self.sort_by = "wait"
-        if self.processes:
-            self.tree.delete(*self.tree.get_children(""))
-            for process in sorted(self.processes, key=lambda e: e.waiting, reverse=reverse):
-                self.tree.insert("", "end", values=(process.name, process.enter, process.calc,
-                                                    process.waiting, process.response))
+        self.sort_rows("waiting")
 
     def sort_response(self):
-        reverse = True if self.sort_by == "response" else False
-        self.sort_by = "response"
-        if self.processes:
-            self.tree.delete(*self.tree.get_children(""))
-            for process in sorted(self.processes, key=lambda e: e.response, reverse=reverse):
-                self.tree.insert("", "end", values=(process.name, process.enter, process.calc,
-                                                    process.waiting, process.response))
+        self.sort_rows("response")
+
+    def sort_rows(self, column: str):
+        if self.rows:
+            self.rows.sort(column)
+            self.first_row = 0
+            self.fill_rows()
+
+    def scroll_rows(self, *args):
+        """
+            Scrollbar Command: ('moveto', fraction) Or ('scroll', number, 'units' Or 'pages').
+        """
+        if not self.rows:
+            return
+        if args[0] == "moveto":
+            self.first_row = int(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            self.first_row += int(args[1]) * (PAGE if args[2] == "pages" else 1)
+        self.fill_rows()
+
+    def fill_rows(self):
+        """
+            Puts The Rows From 'first_row' On Screen, Into The Items Already In The Tree.
+        """
+        count = len(self.rows)
+        self.first_row = max(0, min(self.first_row, count - PAGE))
+        for position, item in enumerate(self.tree.get_children(""), self.first_row):
+            self.tree.item(item, values=self.rows.row(position))
+        if count:
+            self.tree_scrollbar.set(self.first_row / count, min(self.first_row + PAGE, count) / count)
+        else:
+            self.tree_scrollbar.set(0, 1)
+
+    def stop_run(self):
+        """
+            Cancels The Running Simulation And Waits For Its Thread, It May Be Writing The Result Cache,
+            And The Database Is Not Safe To Use From Two Threads. Call It Before Using The Database.
+        """
+        if self.run is not None:
+            self.run.cancel()
+            self.run.join()
+
+    def destroy(self):
+        self.stop_run()  # the controller closes the database after the main loop
+        super(Panel, self).destroy()
 
     def exit_to_text(self):
+        self.stop_run()
         d = Database()
         d["UI"] = "TEXT"
         d.flush()
         self.destroy()
 
     def load_inp(self):
-        self.tree.delete(*self.tree.get_children(""))
         filename = self.string_var_input_filename.get()
-        if os.path.exists(filename):
-            processes, gant_data = self.schedule_callback(self.scheduler_combo.get(), filename)
-            for process in processes:
-                self.tree.insert("", "end", values=(process.name,
-                                                    process.enter,
-                                                    process.calc,
-                                                    process.waiting,
-                                                    process.response))
-            self.processes = processes
-            self.canvas.delete("all")
-            height = 0
-            iterator = iter(gant_data)
-            row_size = 15
-            width = 1000
-            self.canvas.config(width=width, height=30*((len(gant_data)-2)//row_size)+40)
-            for row in range(((len(gant_data)-2)//row_size)+1):
-                mini = gant_data[row*row_size][0]
-                if (row+1)*row_size < len(gant_data):
-                    maxi = gant_data[(row+1)*row_size][0]  # is the maximum
-                else:
-                    maxi = gant_data[-1][0]
-                maxi -= mini
-                height += 30
-                self.canvas.create_rectangle(2, height-28, width, height, fill="#efefef")
-                start, name = next(iterator)
-                start -= mini
-                scale = int((start / maxi) * width)
-                for _, (next_start, next_name) in zip(range(row_size-1), iterator):
-                    next_start -= mini
-                    next_scale = int((next_start / maxi) * width)
-                    self.canvas.create_line(scale, row*30+2, scale, height)
-                    if name != "QUANT":
-                        self.canvas.create_text((scale + next_scale)//2, (2*height-30)//2, text=name)
-                    scale = next_scale
-                    start, name = next_start, next_name
-                if name != 'END':
-                    self.canvas.create_line(scale, row*30+2, scale, height)
-                    if name != 'QUANT':
-                        self.canvas.create_text((scale + width)//2, (2*height-30)//2, text=name)
-                else:
-                    self.canvas.create_line(scale, row * 30 + 2, scale, height)
-                    break
+        if self.run is None and os.path.exists(filename):
+            self.run = self.schedule_callback(self.scheduler_combo.get(), filename)
+            self.run.start()
+            self.load_button.config(state="disabled")
+            self.cancel_button.config(state="normal")
+            self.poll_run()
+
+    def cancel_run(self):
+        if self.run is not None:
+            self.run.cancel()
+            self.string_var_status.set("Cancelling...")
+
+    def poll_run(self):
+        """
+            Shows The Progress Of The Running Simulation, And Its Result Once It Is Done.
+            Runs On The Tk Main Loop Every POLL_MS, The Simulation Thread Never Touches Widgets.
+        """
+        run = self.run
+        if run.stage != DONE:
+            if not run.cancelling and run.stage == READING:
+                self.string_var_status.set(f"Reading: {run.bytes_read // 2 ** 20} of {run.total_bytes // 2 ** 20} MiB")
+            elif not run.cancelling:
+                self.string_var_status.set(f"{run.stage.capitalize()}: {run.events} events, time {run.time}")
+            self.after(POLL_MS, self.poll_run)
+            return
+        run.join()
+        self.run = None
+        self.load_button.config(state="normal")
+        self.cancel_button.config(state="disabled")
+        if run.error is not None:
+            self.string_var_status.set(f"Failed: {run.error}")
+        elif run.result is None:
+            self.string_var_status.set("Cancelled")
+        elif run.cached:
+            self.string_var_status.set("Done, from cache")
+        else:
+            self.string_var_status.set(f"{'Cancelled, partial result' if run.cancelled else 'Done'}: "
+                                       f"{run.events} events, time {run.time}")
+        if run.report is not None:  # like the warning of text mode
+            self.string_var_status.set(f"{self.string_var_status.get()}\n{run.report}")
+        if run.result is not None:
+            self.show_result(*run.result)
+
+    def show_result(self, processes: Union[List[Process], ProcessTable], gant_data: Sequence[Tuple[int, str]]):
+        self.tree.delete(*self.tree.get_children(""))
+        self.processes = processes
+        self.rows = ProcessRows(processes)
+        self.first_row = 0
+        for _ in range(min(PAGE, len(processes))):
+            self.tree.insert("", "end")
+        self.fill_rows()
+        self.gant.show(gant_data)
 
     @staticmethod
     def validate_filename(e):
@@ -1,8 +1,14 @@
 # Text mode view
-from typing import Optional, List, Any, Tuple
+from typing import Optional, List, Any, Tuple, Sequence, TextIO
 import io
+import sys
+import shutil
+from bisect import bisect_left, bisect_right
 from contextlib import redirect_stdout
+from model import GantChart, LegacyGant
 MAX_CHAR = 50  # maximum characters to print in one line
+MAX_SCREENS = 4  # a gant chart is drawn in at most this many terminal screens, the zoom is raised to fit
+SYMBOLS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"  # of processes in the compact gant
 
 
 def _insert_break_line(inp: str, interval: int = None,
@@ -84,12 +90,78 @@ def say_seperator():
     print("-" * MAX_CHAR)
 
 
-def draw_gant(datas: List[Tuple[int, str]], zoom: int = 1):
-    last_one = 0
-    for time, name in datas:
-        print("|\t\t|\n" * (((time - last_one) // zoom) - 1), end="")
-        print("|\t\t|", f"  T: {time}, P: {name}")
-        last_one = time
+def draw_gant(datas: Sequence[Tuple[int, str]], zoom: Optional[int] = None, compact: bool = False,
+              out: Optional[TextIO] = None):
+    """
+        Draws A Gant Chart, A View From get_gant() Or A List Of (Time, Name) Tuples.
+        Each Line (Or Character In Compact Mode) Is 'zoom' Time Units, By Default The Zoom Fits The Chart
+        In The Terminal, A Smaller One Is Raised So The Chart Fits In MAX_SCREENS Screens. Runs Are Found By Binary Search, So The Cost Depends On The Lines Drawn, Not The Chart,
+        Runs Shorter Than A Line Are Merged Into It. Everything Is Written At Once To 'out' (stdout By Default).
+    """
+    chart = datas.chart if isinstance(datas, LegacyGant) else GantChart.from_legacy(datas)
+    out = out if out is not None else sys.stdout
+    if not len(chart):
+        return
+    columns, rows = shutil.get_terminal_size()
+    lines = _gant_compact(chart, zoom, columns, rows) if compact else _gant_lines(chart, zoom, rows)
+    out.write("\n".join(lines) + "\n")
+    out.flush()
+
+
+def _fit_zoom(span: int, cells: int) -> int:
+    return max(1, -(-span // max(cells, 1)))
+
+
+def _gant_lines(chart: GantChart, zoom: Optional[int], rows: int) -> List[str]:
+    starts, ends = chart.starts, chart.ends
+    first, end = starts[0], chart.end
+    zoom = max(zoom or _fit_zoom(end - first, rows - 2), _fit_zoom(end - first, MAX_SCREENS * rows - 2))
+    lines = []
+    for time in range(first, end, zoom):
+        low, high = bisect_left(starts, time), bisect_left(starts, time + zoom)
+        if high > low:  # runs started in this line
+            more = f" (+{high - low - 1})" if high - low > 1 else ""
+            lines.append(f"|\t\t|  T: {starts[low]}, P: {chart.name(low)}{more}")
+        elif low == bisect_right(ends, time):  # nothing runs
+            lines.append(":\t\t:")
+        else:
+            lines.append("|\t\t|")
+    lines.append(f"|\t\t|  T: {end}, END  (1 line = {zoom})")
+    return lines
+
+
+def _gant_compact(chart: GantChart, zoom: Optional[int], columns: int, rows: int) -> List[str]:
+    """
+        One Character Per 'zoom' Time Units, Lines As Wide As The Terminal, Then A Legend.
+        A Process Has Its Symbol, '*' Is More Than One Process, '.' Is Idle.
+    """
+    starts, ends = chart.starts, chart.ends
+    first, end = starts[0], chart.end
+    width = max(columns - 1, 10)
+    zoom = max(zoom or _fit_zoom(end - first, width), _fit_zoom(end - first, width * (MAX_SCREENS * rows // 2 - 2)))
+    symbols = {}
+    lines = []
+    for line_start in range(first, end, zoom * width):
+        bar = []
+        for time in range(line_start, min(line_start + zoom * width, end), zoom):
+            low, high = bisect_right(ends, time), bisect_left(starts, time + zoom)
+            if high <= low:
+                bar.append(".")
+            elif high - low > 1:
+                bar.append("*")
+            else:
+                name = chart.name(low)
+                if name not in symbols:
+                    symbols[name] = SYMBOLS[len(symbols)] if len(symbols) < len(SYMBOLS) else "#"
+                bar.append(symbols[name])
+        lines.append(f"T: {line_start}")
+        lines.append("".join(bar))
+    lines.append(f"T: {end}, END  (1 character = {zoom})")
+    legend = " ".join(f"{symbol}={name}" for name, symbol in symbols.items() if symbol != "#")
+    if "#" in symbols.values():
+        legend += " #=others"
+    lines.append(_insert_break_line(legend, interval=width, end_line=""))
+    return lines
 
 
 def say_warning(message: str):
@@ -0,0 +1,109 @@
+# worker.py - simulations on a background thread, so the gui can show progress and cancel them
+import os
+import threading
+from typing import Callable, Optional, Sequence, Tuple
+from model import ScheduleMother, ProcessTable, TraceReader, is_binary_trace, load_binary_trace
+from cache import ResultCache, Output, workload_digest
+
+PROGRESS_EVERY = 4096  # events between two progress updates, the run is only cancelled at those
+
+WAITING = "waiting"
+READING = "reading"
+SIMULATING = "simulating"
+DONE = "done"
+
+
+class SimulationRun(threading.Thread):
+    """
+        Reads And Simulates A Trace File On A Daemon Thread, start() It And Poll Its Attributes:
+        'stage', 'events' (Events Simulated) And 'time' (Simulated Time) Are Updated Every PROGRESS_EVERY Events,
+        While Reading 'bytes_read' Of 'total_bytes' Are (The File Is Read Twice When It Is Hashed For The Cache).
+        cancel() Stops It At The Next Update Or The Next Chunk Of The File. When 'stage' Is DONE, 'result' Is (output, gant chart),
+        Partial If It Was Cancelled During The Simulation, None If Cancelled Before Or If It Failed,
+        Then 'error' Is The Exception. Complete Results Come From And Go To 'cache' When One Is Given.
+        Text Traces Are Read With A TraceReader, Binary Ones Are Mapped, Unless 'load' Is Given.
+        'report' Is The Reader's report() When It Rejected Lines, Otherwise None.
+        The Thread Never Touches The Gui, Tk Widgets Must Only Be Used From The Main Thread.
+    """
+
+    def __init__(self, scheduler: ScheduleMother, filename: str, cache: Optional[ResultCache] = None,
+                 load: Optional[Callable[[str], ProcessTable]] = None):
+        super(SimulationRun, self).__init__(daemon=True)
+        self.scheduler = scheduler
+        self.filename = filename
+        self.cache = cache
+        self.load = load
+        self.stage = WAITING
+        self.events = 0
+        self.time = 0
+        self.bytes_read = 0
+        self.total_bytes = 0
+        self.cancelled = False
+        self.report: Optional[str] = None
+        self.cached = False  # the result came from the cache
+        self.result: Optional[Tuple[Output, Sequence[Tuple[int, str]]]] = None
+        self.error: Optional[Exception] = None
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelling(self) -> bool:
+        return self._cancel.is_set()
+
+    def run(self):
+        try:
+            self._run()
+        except Exception as error:
+            self.error = error
+        finally:
+            self.stage = DONE
+
+    def _read(self, size: int):
+        self.bytes_read += size
+
+    def _load(self) -> ProcessTable:
+        if self.load is not None:
+            return self.load(self.filename)
+        if is_binary_trace(self.filename):
+            return load_binary_trace(self.filename)  # mapped, nothing is read before the simulation
+        reader = TraceReader(self.filename, cancel=self._cancel, progress=self._read)
+        table = reader.table()
+        if reader.rejected:
+            self.report = reader.report()
+        return table
+
+    def _run(self):
+        self.stage = READING
+        self.total_bytes = os.path.getsize(self.filename) * (2 if self.cache is not None else 1)
+        key = None
+        if self.cache is not None:
+            digest = workload_digest(self.filename, cancel=self._cancel, progress=self._read)
+            if digest is None:
+                self.cancelled = True
+                return
+            key = self.cache.key(digest, self.scheduler)
+            self.result = self.cache.get(key)
+            if self.result is not None:
+                self.cached = True
+                return
+        table = self._load()
+        if self._cancel.is_set():
+            self.cancelled = True
+            return
+        self.scheduler.add_table(table)
+        self.stage = SIMULATING
+        steps = self.scheduler.steps()
+        events = time = 0
+        for events, time in enumerate(steps, 1):
+            if events % PROGRESS_EVERY == 0:
+                self.events, self.time = events, time
+                if self._cancel.is_set():
+                    self.cancelled = True
+                    break
+        steps.close()  # a partial chart and results are kept
+        self.events, self.time = events, time
+        self.result = self.scheduler.get_output(), self.scheduler.get_gant()
+        if key is not None and not self.cancelled:
+            self.cache.put(key, *self.result)
@@ -0,0 +1,105 @@
+# workload.py - synthetic traces: arrival processes and cpu burst mixes, for tests and benchmarks
+# run: python workload.py <kind> <n> <filename> [seed], kinds are the keys of WORKLOADS, '.bin' files are binary traces
+import sys
+import random
+from typing import Callable, Dict, Iterator, Tuple
+from model import ProcessTable, save_binary_trace
+
+EPOCH = 1_700_000_000  # a start time in seconds since 1970, to test schedulers on timestamps that big
+LOAD = 0.9  # cpu time asked per time unit, the ready queue grows without bound above 1
+MEAN_CALC = 10
+PARETO_ALPHA = 1.5  # tail of heavy-tailed sizes, below 2 the variance is infinite
+IO_SHARE = 0.8  # part of io-bound (short) processes in the bimodal mix
+
+
+def exponential_calc(rnd: random.Random, mean_calc: float) -> int:
+    return max(1, round(rnd.expovariate(1 / mean_calc)))
+
+
+def pareto_calc(rnd: random.Random, mean_calc: float) -> int:
+    # paretovariate(a) has a mean of a / (a - 1), capped so one process can't take the whole trace
+    scale = mean_calc * (PARETO_ALPHA - 1) / PARETO_ALPHA
+    return max(1, min(round(scale * rnd.paretovariate(PARETO_ALPHA)), int(mean_calc * 1000)))
+
+
+def bimodal_calc(rnd: random.Random, mean_calc: float) -> int:
+    # io-bound processes run 1 to 3 units, cpu-bound ones make up the rest of the mean
+    if rnd.random() < IO_SHARE:
+        return rnd.randint(1, 3)
+    cpu_mean = max(4, round((mean_calc - IO_SHARE * 2) / (1 - IO_SHARE)))
+    return rnd.randint(cpu_mean // 2, cpu_mean * 3 // 2)
+
+
+def poisson_arrivals(rnd: random.Random, mean_gap: float) -> Iterator[float]:
+    """
+        Arrival Times Of A Poisson Process, Exponential Gaps With A Mean Of 'mean_gap'.
+    """
+    time = 0.0
+    while True:
+        yield time
+        time += rnd.expovariate(1 / mean_gap)
+
+
+def burst_arrivals(rnd: random.Random, mean_gap: float) -> Iterator[float]:
+    """
+        Bursts Of Pareto-Distributed Sizes Arriving At Once, The Quiet Time After Each One
+        Is As Long As Its Size Asks, So The Mean Gap Per Process Stays 'mean_gap'.
+    """
+    time = 0.0
+    while True:
+        size = max(1, round(rnd.paretovariate(PARETO_ALPHA)))
+        for _ in range(size):
+            yield time
+        time += rnd.expovariate(1 / (mean_gap * size))
+
+
+WORKLOADS: Dict[str, Tuple[Callable, Callable]] = {  # kind: (arrivals, calc)
+    "poisson": (poisson_arrivals, exponential_calc),
+    "heavy": (burst_arrivals, pareto_calc),
+    "bimodal": (poisson_arrivals, bimodal_calc),
+}
+
+
+def rows(kind: str, n: int, seed: int = 4001, load: float = LOAD, mean_calc: float = MEAN_CALC,
+         start: int = 0) -> Iterator[Tuple[str, int, int]]:
+    """
+        Yields n (name, enter, calc) Rows Of A Workload In Order Of Enter Time, Same Arguments, Same Rows.
+        :param kind: key of WORKLOADS
+        :param load: mean calc time asked per time unit, 1 keeps the cpu busy
+        :param start: enter time of the first process, like EPOCH
+    """
+    arrivals, calc = WORKLOADS[kind]
+    rnd = random.Random(seed)
+    times = arrivals(rnd, mean_calc / load)
+    for index in range(n):
+        yield f"P{index}", start + int(next(times)), calc(rnd, mean_calc)
+
+
+def generate(kind: str, n: int, **options) -> ProcessTable:
+    """
+        A Workload As A ProcessTable, Takes The Options Of rows().
+    """
+    table = ProcessTable()
+    for row in rows(kind, n, **options):
+        table.append(*row)
+    return table
+
+
+def write_workload(filename: str, kind: str, n: int, **options):
+    """
+        Writes A Workload As A Trace File, A Binary One If The Name Ends With '.bin', Otherwise Text.
+    """
+    if filename.endswith(".bin"):
+        save_binary_trace(generate(kind, n, **options), filename)
+        return
+    with open(filename, "w") as file:
+        for name, enter, calc in rows(kind, n, **options):
+            file.write(f"{name} {enter} {calc}\n")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (4, 5) or sys.argv[1] not in WORKLOADS:
+        print(f"usage: python workload.py <{'|'.join(WORKLOADS)}> <n> <filename> [seed]")
+        sys.exit(2)
+    seed = {"seed": int(sys.argv[4])} if len(sys.argv) == 5 else {}
+    write_workload(sys.argv[3], sys.argv[1], int(sys.argv[2]), **seed)